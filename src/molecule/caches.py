@@ -0,0 +1,271 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Size bounded management of the molecule cache directories."""
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import logging
+import os
+import re
+import shutil
+import time
+from typing import NamedTuple
+
+from molecule import locking, util
+
+LOG = logging.getLogger(__name__)
+# Cache directories holding one entry per project, see Config.cache_directory.
+CACHE_DIRECTORIES = ("molecule", "molecule_parallel")
+# Directory under the molecule cache holding caches shared between projects.
+SHARED_DIRECTORY = ".shared"
+DEFAULT_MAX_SIZE = "5G"
+# Seconds between two automatic prunes, each one walks the whole cache.
+PRUNE_INTERVAL = 24 * 60 * 60
+_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+
+
+class CacheEntry(NamedTuple):
+    """A directory or file evicted as a whole."""
+
+    path: str
+    size: int
+    last_used: float
+    active: bool
+
+
+def root() -> str:
+    """Return the directory holding the molecule cache directories.
+
+    Unlike the scenario ephemeral directory, it does not follow
+    ``MOLECULE_EPHEMERAL_DIRECTORY``.
+    """
+    return os.path.abspath(
+        os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    )
+
+
+def directory(namespace: str) -> str:
+    """Return the directory of a shared cache, creating it when missing.
+
+    :param namespace: A string containing the name of the shared cache.
+    :return: str
+    """
+    d = os.path.join(root(), "molecule", SHARED_DIRECTORY, namespace)
+    os.makedirs(d, mode=0o700, exist_ok=True)
+    return os.path.normpath(d)
+
+
+def parse_size(value: str) -> int:
+    """Return the number of bytes of a size like ``500M`` or ``5G``.
+
+    :param value: A string containing a size with an optional unit.
+    :return: int
+    """
+    match = _SIZE.match(str(value))
+    if not match:
+        msg = f"Invalid cache size '{value}', expected a value like 500M or 5G."
+        raise ValueError(msg)
+    number, unit = match.groups()
+    return int(float(number) * _UNITS[unit.lower()])
+
+
+def max_size() -> int:
+    """Return the size cap, from ``MOLECULE_CACHE_MAX_SIZE`` when set."""
+    return parse_size(os.environ.get("MOLECULE_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE))
+
+
+def entries() -> list[CacheEntry]:
+    """Return the cache entries, least recently used first.
+
+    Each project directory is an entry, as is each item of a shared cache.
+    Entries holding created instances or used by a running molecule process
+    are reported as active and never evicted automatically.
+
+    :return: list
+    """
+    result = []
+    for name in CACHE_DIRECTORIES:
+        path = os.path.join(root(), name)
+        for child in _listdir(path):
+            if name == "molecule" and child == SHARED_DIRECTORY:
+                continue
+            child = os.path.join(path, child)
+            if os.path.isdir(child) and not os.path.islink(child):
+                result.append(_entry(child, _is_active(child)))
+    shared = os.path.join(root(), "molecule", SHARED_DIRECTORY)
+    for namespace in _listdir(shared):
+        result.extend(
+            _entry(os.path.join(shared, namespace, child), False)
+            for child in _listdir(os.path.join(shared, namespace))
+        )
+    return sorted(result, key=lambda e: e.last_used)
+
+
+def prune(size: int | None = None, keep=()) -> list[CacheEntry]:
+    """Evict least recently used entries until the cache fits in size.
+
+    :param size: An optional int containing the size cap in bytes, default
+     is :func:`max_size`.
+    :param keep: An optional iterable of paths whose entries are kept.
+    :return: list of the entries removed.
+    """
+    if size is None:
+        size = max_size()
+    current = entries()
+    total = sum(e.size for e in current)
+    removed = []
+    for entry in current:
+        if total <= size:
+            break
+        if entry.active or any(_contains(entry.path, k) for k in keep):
+            continue
+        _remove(entry.path)
+        total -= entry.size
+        removed.append(entry)
+    return removed
+
+
+def clear(force: bool = False) -> list[CacheEntry]:
+    """Remove every cache entry, active ones only when forced.
+
+    :param force: A bool telling to also remove active entries.
+    :return: list of the entries removed.
+    """
+    removed = []
+    for entry in entries():
+        if entry.active and not force:
+            LOG.warning(
+                "Keeping %s, it holds created instances or is in use",
+                entry.path,
+            )
+            continue
+        _remove(entry.path)
+        removed.append(entry)
+    return removed
+
+
+def prune_if_due(keep=()) -> None:
+    """Prune the cache when it was not done within :data:`PRUNE_INTERVAL`.
+
+    Automatic pruning is opt-in, it only runs when ``MOLECULE_CACHE_MAX_SIZE``
+    is set.
+
+    :param keep: An optional iterable of paths whose entries are kept.
+    :return: None
+    """
+    if not os.environ.get("MOLECULE_CACHE_MAX_SIZE"):
+        return
+    stamp = os.path.join(directory(""), ".last_prune")
+    with contextlib.suppress(OSError):
+        if time.time() - os.path.getmtime(stamp) < PRUNE_INTERVAL:
+            return
+    with open(stamp, "w"):
+        pass
+    try:
+        removed = prune(keep=keep)
+    except ValueError as e:
+        util.sysexit_with_message(str(e))
+    for entry in removed:
+        LOG.info("Evicted %s from the cache (%s bytes)", entry.path, entry.size)
+
+
+def _entry(path: str, active: bool) -> CacheEntry:
+    try:
+        last_used = os.lstat(path).st_mtime
+    except OSError:
+        last_used = 0.0
+    return CacheEntry(path, _size(path), last_used, active)
+
+
+def _size(path: str) -> int:
+    try:
+        if not os.path.isdir(path) or os.path.islink(path):
+            return os.lstat(path).st_size
+        total = 0
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    total += _size(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+        return total
+    except OSError:
+        return 0
+
+
+def _is_active(path: str) -> bool:
+    """Return True when a scenario of the project holds instances or a lock."""
+    for scenario in _listdir(path):
+        scenario = os.path.join(path, scenario)
+        state_file = os.path.join(scenario, "state.yml")
+        journal = os.path.join(scenario, "state.journal")
+        with contextlib.suppress(OSError):
+            if os.path.getsize(journal):
+                return True
+        try:
+            if (util.safe_load_file(state_file) or {}).get("created"):
+                return True
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # an unreadable state may still track created instances
+            return True
+        if _is_locked(os.path.join(scenario, ".lock")):
+            return True
+    return False
+
+
+def _is_locked(path: str) -> bool:
+    # closing any descriptor of the file would drop a lock held by this process
+    if locking.manager.held(path):
+        return True
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError:
+        return False
+    try:
+        fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return True
+    finally:
+        os.close(fd)
+    return False
+
+
+def _contains(path: str, other: str) -> bool:
+    return other == path or other.startswith(path.rstrip(os.sep) + os.sep)
+
+
+def _listdir(path: str) -> list[str]:
+    try:
+        return sorted(os.listdir(path))
+    except OSError:
+        return []
+
+
+def _remove(path: str) -> None:
+    LOG.debug("Removing %s", path)
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
@@ -25,6 +25,7 @@
 # or builtins.
 
 from molecule.command import base  # noqa
+from molecule.command import cache  # noqa
 from molecule.command import check  # noqa
 from molecule.command import cleanup  # noqa
 from molecule.command import converge  # noqa
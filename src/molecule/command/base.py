@@ -21,22 +21,17 @@
 
 import abc
 import collections
-import contextlib
 import logging
 import os
 import shutil
-import subprocess
 from collections.abc import Callable
 from typing import Any
 
 import click
-import wcmatch.pathlib
-import wcmatch.wcmatch
 from click_help_colors import HelpColorsCommand, HelpColorsGroup
-from wcmatch import glob
 
 import molecule.scenarios
-from molecule import config, logger, text, util
+from molecule import caches, config, discovery, logger, text, util
 from molecule.console import should_do_markup
 
 LOG = logging.getLogger(__name__)
@@ -107,6 +102,7 @@ def execute_cmdline_scenarios(scenario_name, args, command_args, ansible_args=()
             ", ".join(scenarios.sequence(scenario_name)),
         )
 
+    used = []
     for scenario in scenarios:
         if scenario.config.config["prerun"]:
             role_name_check = scenario.config.config["role_name_check"]
@@ -117,9 +113,12 @@ def execute_cmdline_scenarios(scenario_name, args, command_args, ansible_args=()
             )
 
         if command_args.get("subcommand") == "reset":
-            LOG.info("Removing %s", scenario.ephemeral_directory)
-            shutil.rmtree(scenario.ephemeral_directory)
+            for path in (scenario.ephemeral_directory, scenario.persistent_directory):
+                if path:
+                    LOG.info("Removing %s", path)
+                    shutil.rmtree(path)
             return
+        used.append(scenario.ephemeral_directory)
         try:
             execute_scenario(scenario)
         except SystemExit:
@@ -141,6 +140,8 @@ def execute_cmdline_scenarios(scenario_name, args, command_args, ansible_args=()
             else:
                 raise
 
+    caches.prune_if_due(keep=used)
+
 
 def execute_subcommand(config, subcommand_and_args):
     """Execute subcommand."""
@@ -153,6 +154,8 @@ def execute_subcommand(config, subcommand_and_args):
     # particularly the setting of ansible options in create/destroy,
     # and is also used for reporting in execute_cmdline_scenarios
     config.action = subcommand
+    # playbooks read the state file exported as MOLECULE_STATE_FILE
+    config.state.compact()
 
     return command(config).execute(args)
 
@@ -163,8 +166,21 @@ def execute_scenario(scenario):
     :param scenario: The scenario to execute.
     :returns: None
     """
-    for action in scenario.sequence:
-        execute_subcommand(scenario.config, action)
+    # cached facts only live for the duration of a sequence
+    scenario.config.provisioner.clear_facts()
+    try:
+        for action in scenario.sequence:
+            execute_subcommand(scenario.config, action)
+    finally:
+        # a failed action may still have created instances worth recording
+        scenario.config.state.compact()
+        scenario.persist()
+
+    LOG.debug(
+        "Environment rebuilds for %s scenario: %s",
+        scenario.name,
+        scenario.config.env_rebuilds,
+    )
 
     if (
         "destroy" in scenario.sequence
@@ -176,29 +192,6 @@ def execute_scenario(scenario):
             scenario._remove_scenario_state_directory()
 
 
-def filter_ignored_scenarios(scenario_paths) -> list[str]:
-    command = ["git", "check-ignore", *scenario_paths]
-
-    with contextlib.suppress(subprocess.CalledProcessError, FileNotFoundError):
-        proc = subprocess.run(
-            args=command,
-            capture_output=True,
-            check=True,
-            text=True,
-            shell=False,
-        )
-
-    try:
-        ignored = proc.stdout.splitlines()
-        paths = [
-            candidate for candidate in scenario_paths if str(candidate) not in ignored
-        ]
-    except NameError:
-        paths = scenario_paths
-
-    return paths
-
-
 def get_configs(args, command_args, ansible_args=(), glob_str=MOLECULE_GLOB):
     """Glob the current directory for Molecule config files, instantiate config \
     objects, and returns a list.
@@ -210,14 +203,7 @@ def get_configs(args, command_args, ansible_args=(), glob_str=MOLECULE_GLOB):
      `ansible-playbook` command.
     :return: list
     """
-    scenario_paths = glob.glob(
-        glob_str,
-        flags=wcmatch.pathlib.GLOBSTAR
-        | wcmatch.pathlib.BRACE
-        | wcmatch.pathlib.DOTGLOB,
-    )
-
-    scenario_paths = filter_ignored_scenarios(scenario_paths)
+    scenario_paths = discovery.find(glob_str)
     configs = [
         config.Config(
             molecule_file=util.abs_path(c),
@@ -269,6 +255,7 @@ def click_group_ex():
         help_headers_color="yellow",
         help_options_color="green",
         help_options_custom_colors={
+            "cache": "blue",
             "drivers": "blue",
             "init": "blue",
             "list": "blue",
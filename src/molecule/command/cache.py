@@ -0,0 +1,101 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Cache Command Module."""
+
+import datetime
+import logging
+
+import click
+from rich import box
+from rich.table import Table
+
+from molecule import caches, util
+from molecule.command import base
+from molecule.console import console
+
+LOG = logging.getLogger(__name__)
+
+
+@base.click_group_ex()  # type: ignore
+def cache():  # pragma: no cover
+    """Manage the molecule cache."""
+
+
+@cache.command()
+def stats():  # pragma: no cover
+    """Show cache entries, least recently used first."""
+    entries = caches.entries()
+    t = Table(box=box.MINIMAL)
+    for header in ("Entry", "Size", "Last used", "Active"):
+        t.add_column(header)
+    for entry in entries:
+        t.add_row(
+            entry.path,
+            _format_size(entry.size),
+            datetime.datetime.fromtimestamp(entry.last_used, tz=datetime.timezone.utc)
+            .astimezone()
+            .strftime("%Y-%m-%d %H:%M"),
+            "yes" if entry.active else "",
+        )
+    console.print(t)
+    console.print(
+        f"Total: {_format_size(sum(e.size for e in entries))} "
+        f"of {_format_size(_max_size(None))} in {caches.root()}",
+    )
+
+
+@cache.command()
+@click.option(
+    "--max-size",
+    default=None,
+    help="Size the cache is pruned to, like 500M or 5G. (MOLECULE_CACHE_MAX_SIZE)",
+)
+def prune(max_size):  # pragma: no cover
+    """Evict least recently used entries exceeding the cache size."""
+    for entry in caches.prune(_max_size(max_size)):
+        LOG.info("Removed %s (%s)", entry.path, _format_size(entry.size))
+
+
+@cache.command()
+@click.option(
+    "--force",
+    is_flag=True,
+    default=False,
+    help="Also remove entries holding created instances or in use.",
+)
+def clear(force):  # pragma: no cover
+    """Remove all cache entries."""
+    for entry in caches.clear(force=force):
+        LOG.info("Removed %s (%s)", entry.path, _format_size(entry.size))
+
+
+def _max_size(value):
+    try:
+        return caches.parse_size(value) if value else caches.max_size()
+    except ValueError as e:
+        util.sysexit_with_message(str(e))
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024  # type: ignore
+    return f"{size:.1f} TiB"
@@ -24,7 +24,7 @@
 
 import click
 
-from molecule import util
+from molecule import ssh, util
 from molecule.api import drivers
 from molecule.command import base
 from molecule.config import DEFAULT_DRIVER
@@ -48,6 +48,8 @@ def execute(self, action_args=None):
             return
 
         self._config.provisioner.destroy()
+        self._config.provisioner.clear_facts()
+        ssh.close_masters(self._config.scenario.ephemeral_directory)
         self._config.state.reset()
 
 
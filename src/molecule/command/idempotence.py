@@ -20,11 +20,12 @@
 """Idempotence Command Module."""
 
 import logging
+import os
 import re
 
 import click
 
-from molecule import util
+from molecule import events, util
 from molecule.command import base
 from molecule.text import strip_ansi_escape
 
@@ -36,6 +37,10 @@ class Idempotence(base.Base):
 
     If no tasks will be marked as changed \
     the scenario will be considered idempotent.
+
+    With ``--abort-after N``, or ``MOLECULE_IDEMPOTENCE_ABORT_AFTER``, the
+    converge stops as soon as N task results reported a change instead of
+    running to the end, the changed tasks seen so far are reported.
     """
 
     def execute(self, action_args=None):
@@ -48,17 +53,46 @@ def execute(self, action_args=None):
             msg = "Instances not converged.  Please converge instances first."
             util.sysexit_with_message(msg)
 
-        output = self._config.provisioner.converge()
+        abort_after = self._abort_after()
+        if abort_after:
+            output = self._config.provisioner.converge(abort_after=abort_after)
+        else:
+            output = self._config.provisioner.converge()
+        recorded = events.load(self._config.provisioner.events_file)
 
-        idempotent = self._is_idempotent(output)
+        if recorded is not None:
+            changed = [str(e) for e in events.changed(recorded)]
+            idempotent = not changed
+        else:
+            # the callback plugin did not run, fall back to parsing the output
+            idempotent = self._is_idempotent(output)
+            changed = [] if idempotent else self._non_idempotent_tasks(output)
         if idempotent:
             msg = "Idempotence completed successfully."
             LOG.info(msg)
         else:
-            details = "\n".join(self._non_idempotent_tasks(output))
+            details = "\n".join(changed)
             msg = f"Idempotence test failed because of the following tasks:\n{details}"
+            if abort_after and len(changed) >= abort_after:
+                msg += f"\nConverge was stopped after {abort_after} changed tasks."
             util.sysexit_with_message(msg)
 
+    def _abort_after(self):
+        """Return the number of changed tasks stopping the converge, 0 for none.
+
+        :return: int
+        """
+        value = self._config.command_args.get("abort_after")
+        if value is not None:
+            return value
+        value = os.environ.get("MOLECULE_IDEMPOTENCE_ABORT_AFTER", "0")
+        if not value.isdigit():
+            util.sysexit_with_message(
+                f"Invalid MOLECULE_IDEMPOTENCE_ABORT_AFTER '{value}', "
+                "expected a positive number.",
+            )
+        return int(value)
+
     def _is_idempotent(self, output):
         """Parse the output of the provisioning for changed and returns a bool.
 
@@ -112,13 +146,20 @@ def _non_idempotent_tasks(self, output):
     default=base.MOLECULE_DEFAULT_SCENARIO_NAME,
     help=f"Name of the scenario to target. ({base.MOLECULE_DEFAULT_SCENARIO_NAME})",
 )
+@click.option(
+    "--abort-after",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Stop the converge once this many tasks changed. "
+    "(MOLECULE_IDEMPOTENCE_ABORT_AFTER)",
+)
 @click.argument("ansible_args", nargs=-1, type=click.UNPROCESSED)
-def idempotence(ctx, scenario_name, ansible_args):  # pragma: no cover
+def idempotence(ctx, scenario_name, abort_after, ansible_args):  # pragma: no cover
     """Use the provisioner to configure the instances and parse the output to \
     determine idempotence.
     """
     args = ctx.obj.get("args")
     subcommand = base._get_subcommand(__name__)
-    command_args = {"subcommand": subcommand}
+    command_args = {"subcommand": subcommand, "abort_after": abort_after}
 
     base.execute_cmdline_scenarios(scenario_name, args, command_args, ansible_args)
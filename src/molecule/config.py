@@ -19,11 +19,12 @@
 #  DEALINGS IN THE SOFTWARE.
 """Config Module."""
 
+import collections
 import copy
 import logging
 import os
 import warnings
-from collections.abc import MutableMapping
+from collections.abc import Callable, MutableMapping
 from pathlib import Path
 from uuid import uuid4
 
@@ -48,6 +49,11 @@
 
 MOLECULE_EMBEDDED_DATA_DIR = os.path.dirname(data_module)
 
+# parsed config files, see Config._load, least recently used first
+_parsed_configs: collections.OrderedDict[tuple, dict] = collections.OrderedDict()
+# Parsed configs kept, long running processes may load many revisions.
+MAX_PARSED_CONFIGS = 64
+
 
 @cache
 def ansible_version() -> Version:
@@ -106,6 +112,8 @@ def __init__(
          ``ansible-playbook`` command.
         :returns: None
         """
+        self._env_cache: dict[str, MutableMapping] = {}
+        self.env_rebuilds: collections.Counter = collections.Counter()
         self.molecule_file = molecule_file
         self.args = args
         self.command_args = command_args
@@ -122,6 +130,43 @@ def after_init(self):
         if self.molecule_file:
             self._validate()
 
+    @property
+    def args(self):
+        return self._args
+
+    @args.setter
+    def args(self, value):
+        self._args = value
+        self.invalidate_env()
+
+    @property
+    def config(self):
+        return self._config
+
+    @config.setter
+    def config(self, value):
+        self._config = value
+        self.invalidate_env()
+
+    def invalidate_env(self) -> None:
+        """Drop the cached environments, forcing them to be rebuilt."""
+        self._env_cache.clear()
+
+    def cached_env(self, name: str, factory: Callable[[], MutableMapping]):
+        """Return the environment cached as ``name``, building it if needed.
+
+        Cached environments are dropped when the action or the config changes,
+        and rebuilds are counted in ``env_rebuilds`` for debugging purposes.
+
+        :param name: A string identifying the environment.
+        :param factory: A callable building the environment.
+        :return: The cached environment.
+        """
+        if name not in self._env_cache:
+            self.env_rebuilds[name] += 1
+            self._env_cache[name] = factory()
+        return self._env_cache[name]
+
     def write(self) -> None:
         util.write_file(self.config_file, util.safe_dump(self.config))
 
@@ -163,6 +208,8 @@ def action(self):
 
     @action.setter
     def action(self, value):
+        if value != self._action:
+            self.invalidate_env()
         self._action = value
 
     @property
@@ -199,12 +246,16 @@ def driver(self):
 
     @property  # type: ignore
     def env(self):
+        return self.cached_env("config", self._get_env)
+
+    def _get_env(self):
         return {
             "MOLECULE_DEBUG": str(self.debug),
             "MOLECULE_FILE": self.config_file,
             "MOLECULE_ENV_FILE": str(self.env_file),
             "MOLECULE_STATE_FILE": self.state.state_file,
             "MOLECULE_INVENTORY_FILE": self.provisioner.inventory_file,
+            "MOLECULE_EVENTS_FILE": self.provisioner.events_file,
             "MOLECULE_EPHEMERAL_DIRECTORY": self.scenario.ephemeral_directory,
             "MOLECULE_SCENARIO_DIRECTORY": self.scenario.directory,
             "MOLECULE_PROJECT_DIRECTORY": self.project_directory,
@@ -252,7 +303,7 @@ def state(self):
                     self.molecule_file,
                 )
 
-        return state.State(self)
+        return myState
 
     @cached_property
     def verifier(self):
@@ -315,7 +366,7 @@ def _reget_config(self):
 
         :return: dict
         """
-        env = util.merge_dicts(os.environ, self.env)
+        env = util.layered_env(os.environ, self.env)
         env = set_env_from_file(env, self.env_file)
 
         return self._combine(env=env)
@@ -338,26 +389,48 @@ def _combine(self, env=os.environ, keep_string=None) -> MutableMapping:
         for base_config in base_configs:
             with open(base_config) as stream:
                 s = stream.read()
-                interpolated_config = self._interpolate(s, env, keep_string)
                 defaults = util.merge_dicts(
                     defaults,
-                    util.safe_load(interpolated_config),
+                    self._load(s, env, keep_string),
                 )
 
         if self.molecule_file:
             with open(self.molecule_file) as stream:
                 s = stream.read()
-                interpolated_config = self._interpolate(s, env, keep_string)
                 defaults = util.merge_dicts(
                     defaults,
-                    util.safe_load(interpolated_config),
+                    self._load(s, env, keep_string),
                 )
 
         return defaults
 
+    def _load(self, stream: str, env: MutableMapping, keep_string: str) -> dict:
+        """Interpolate and parse a config file content and returns a dict.
+
+        The last :data:`MAX_PARSED_CONFIGS` parsed configs are cached per
+        process, keyed by the content and the values of the environment variables the content references, so changes
+        to unrelated variables never invalidate them.
+        """
+        env = set_env_from_file(env, self.env_file)
+        i = interpolation.Interpolator(interpolation.TemplateWithDefaults, env)
+        key = (stream, keep_string, i.environment_key(stream, keep_string))
+        if key in _parsed_configs:
+            _parsed_configs.move_to_end(key)
+        else:
+            _parsed_configs[key] = util.safe_load(
+                self._substitute(stream, env, keep_string),
+            )
+            while len(_parsed_configs) > MAX_PARSED_CONFIGS:
+                _parsed_configs.popitem(last=False)
+        return copy.deepcopy(_parsed_configs[key])
+
     def _interpolate(self, stream: str, env: MutableMapping, keep_string: str) -> str:
         env = set_env_from_file(env, self.env_file)
 
+        return self._substitute(stream, env, keep_string)
+
+    def _substitute(self, stream: str, env: MutableMapping, keep_string: str) -> str:
+        """Interpolate stream with env, already holding the env file values."""
         i = interpolation.Interpolator(interpolation.TemplateWithDefaults, env)
 
         try:
@@ -406,6 +479,7 @@ def _get_defaults(self) -> MutableMapping:
                     "host_vars": {},
                     "group_vars": {},
                     "links": {},
+                    "format": "auto",
                 },
                 "children": {},
                 "playbooks": {
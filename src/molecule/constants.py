@@ -7,6 +7,7 @@
 RC_UNKNOWN_ERROR = (
     5  # Unexpected errors for which we do not have more specific codes, yet
 )
+RC_ABORTED = 6  # Ansible run stopped on purpose, like a failed idempotence
 
 
 MOLECULE_HEADER = "# Molecule managed"
@@ -102,10 +102,10 @@ def _has_requirements_file(self):
 
     @property
     def default_env(self):
-        e = {}
+        env = util.Environment()
         for invoker in self.invocations:
-            e = util.merge(e, invoker.default_env)
-        return e
+            env = env.new_child(invoker.default_env)
+        return env
 
     @property
     def default_options(self):
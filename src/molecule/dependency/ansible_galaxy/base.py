@@ -89,7 +89,7 @@ def options(self):
 
     @property
     def default_env(self):
-        return util.merge_dicts(os.environ, self._config.env)
+        return util.layered_env(os.environ, self._config.env)
 
     def bake(self):
         """Bake an ``ansible-galaxy`` command so it's ready to execute and returns \
@@ -104,8 +104,7 @@ def default_env(self):  # pragma: no cover
 
         :return: dict
         """
-        env = util.merge_dicts(os.environ, self._config.env)
-        return env
+        return util.layered_env(os.environ, self._config.env)
 
     @property
     def name(self):
@@ -128,7 +127,7 @@ def options(self):
 
     @property
     def env(self):
-        return util.merge_dicts(
+        return util.layered_env(
             self.default_env,
             self._config.config["dependency"]["env"],
         )
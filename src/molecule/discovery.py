@@ -0,0 +1,606 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Scenario discovery backed by a persistent directory index."""
+from __future__ import annotations
+
+import contextlib
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import time
+
+from ansible_compat.ports import cache
+from wcmatch import glob
+
+from molecule import caches
+
+LOG = logging.getLogger(__name__)
+
+GLOB_FLAGS = glob.GLOBSTAR | glob.BRACE | glob.DOTGLOB
+INDEX_VERSION = 1
+# Directories never worth descending into while looking for scenarios.
+IGNORED_DIRECTORIES = frozenset(
+    (
+        ".cache",
+        ".git",
+        ".hg",
+        ".nox",
+        ".svn",
+        ".tox",
+        "__pycache__",
+        "node_modules",
+    ),
+)
+# A directory modified within this interval may change again without its
+# mtime changing, so its listing is not trusted on the next run.
+RACY_INTERVAL_NS = 2 * 10**9
+_MAGIC = re.compile(r"[*?[{\\]")
+_CONFIG_SECTION = re.compile(r'\[\s*([^\]\s"]+)\s*("[^"]*")?\s*\]')
+_EXCLUDES_FILE_OPTION = re.compile(r"excludesfile\s*=(.*)$", re.IGNORECASE)
+
+
+class GitIgnore:
+    """In-process matcher for ``.gitignore`` rules.
+
+    Patterns are read from the ``core.excludesFile`` of the git config, or
+    the user wide excludes file when unset, ``.git/info/exclude`` and every
+    ``.gitignore`` between the repository root and the path being matched,
+    with the same precedence git applies. Each file is compiled once and
+    cached until its mtime changes.
+
+    As with ``git check-ignore``, files tracked in the git index are never
+    ignored, the index is only read once a pattern matches.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize a matcher for the repository containing path.
+
+        :param path: A string containing a path inside a git work tree.
+        :return: None
+        """
+        self.root = _find_work_tree(os.path.abspath(path))
+        self._gitignores: dict[str, tuple] = {}
+        self._excludes: list[tuple] = []
+        self._git_dir = None
+        self._tracked_dirs: frozenset[str] | None = None
+        if self.root:
+            self._git_dir = _git_dir(self.root)
+            self._excludes.append(
+                ("", _read_patterns(_global_excludes_file(self._git_dir))),
+            )
+            if self._git_dir:
+                exclude = os.path.join(self._git_dir, "info", "exclude")
+                self._excludes.append(("", _read_patterns(exclude)))
+
+    def match(self, path: str, is_dir: bool = False) -> bool:
+        """Return True when the rules ignore path itself.
+
+        Parent directories are not checked, callers walking a tree are
+        expected to not descend into ignored directories.
+
+        :param path: A string containing an absolute path.
+        :param is_dir: A bool telling if path is a directory.
+        :return: bool
+        """
+        rel = self._relative(path)
+        if not rel:
+            return False
+        parts = rel.split("/")
+        sources = list(self._excludes)
+        for i in range(len(parts)):
+            base = "/".join(parts[:i])
+            sources.append((base, self._gitignore(base)))
+        # the last matching pattern from the most specific source wins
+        for base, patterns in reversed(sources):
+            relative = "/".join(parts[len(base.split("/")) if base else 0 :])
+            for regex, negate, dir_only in reversed(patterns):
+                if dir_only and not is_dir:
+                    continue
+                if regex.match(relative):
+                    return not negate and (is_dir or not self.tracked(path))
+        return False
+
+    def tracked(self, path: str) -> bool:
+        """Return True when path is a file tracked in the git index.
+
+        :param path: A string containing an absolute path.
+        :return: bool
+        """
+        rel = self._relative(path)
+        return bool(rel) and rel in self._index()
+
+    def has_tracked(self, path: str) -> bool:
+        """Return True when the directory path holds tracked files.
+
+        :param path: A string containing an absolute path.
+        :return: bool
+        """
+        if self._tracked_dirs is None:
+            self._tracked_dirs = frozenset(
+                name[:i]
+                for name in self._index()
+                for i, c in enumerate(name)
+                if c == "/"
+            )
+        rel = self._relative(path)
+        return bool(rel) and rel in self._tracked_dirs
+
+    def _relative(self, path: str) -> str | None:
+        if not self.root:
+            return None
+        rel = os.path.relpath(path, self.root)
+        if rel == "." or rel.startswith(".."):
+            return None
+        return rel.replace(os.sep, "/")
+
+    def _index(self) -> frozenset[str]:
+        if not self._git_dir:
+            return frozenset()
+        return _read_index(os.path.join(self._git_dir, "index"))
+
+    def ignored(self, path: str) -> bool:
+        """Return True when path or any of its parent directories is ignored.
+
+        :param path: A string containing a path to an existing file or
+         directory.
+        :return: bool
+        """
+        path = os.path.abspath(path)
+        if not self.root:
+            return False
+        rel = os.path.relpath(path, self.root)
+        if rel.startswith(".."):
+            return False
+        current = self.root
+        for part in rel.split(os.sep)[:-1]:
+            current = os.path.join(current, part)
+            if self.match(current, is_dir=True):
+                return not self.tracked(path)
+        return self.match(path, is_dir=os.path.isdir(path))
+
+    def _gitignore(self, base: str) -> tuple:
+        if base not in self._gitignores:
+            path = os.path.join(self.root, base, ".gitignore")
+            self._gitignores[base] = _read_patterns(path)
+        return self._gitignores[base]
+
+
+def _find_work_tree(path: str) -> str | None:
+    while True:
+        if os.path.exists(os.path.join(path, ".git")):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _git_dir(root: str) -> str | None:
+    path = os.path.join(root, ".git")
+    if os.path.isdir(path):
+        return path
+    # work trees and submodules point to their git directory
+    try:
+        with open(path, encoding="utf-8") as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    if line.startswith("gitdir:"):
+        return os.path.join(root, line[len("gitdir:") :].strip())
+    return None
+
+
+def _global_excludes_file(git_dir: str | None) -> str:
+    """Return the excludes file set by ``core.excludesFile`` or the default.
+
+    The system, user and repository configs are read in order of precedence,
+    include directives are not followed.
+    """
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser(
+        "~/.config",
+    )
+    configs = [
+        "/etc/gitconfig",
+        os.path.join(config_home, "git", "config"),
+        os.path.expanduser("~/.gitconfig"),
+    ]
+    if git_dir:
+        configs.append(os.path.join(git_dir, "config"))
+    value = None
+    for config in configs:
+        value = _read_excludes_file_option(config) or value
+    if value:
+        return os.path.expanduser(value)
+    return os.path.join(config_home, "git", "ignore")
+
+
+def _read_excludes_file_option(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8", errors="surrogateescape") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    value = None
+    section = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        header = _CONFIG_SECTION.match(line)
+        if header:
+            # only the plain [core] section, not a [core "subsection"]
+            section = None if header.group(2) else header.group(1).lower()
+            continue
+        option = _EXCLUDES_FILE_OPTION.match(line)
+        if section == "core" and option:
+            value = option.group(1).strip()
+            if value.startswith('"'):
+                value = value[1:].split('"', 1)[0]
+            else:
+                value = re.split(r"\s[#;]", value, maxsplit=1)[0].strip()
+    return value
+
+
+def _read_index(path: str) -> frozenset[str]:
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return frozenset()
+    return _parse_index(path, mtime)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_index(path: str, mtime: int) -> frozenset[str]:
+    """Return the paths of the entries of a git index file.
+
+    Versions 2 to 4 of the index format are supported, an unreadable index
+    holds no entries.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        signature, version, count = struct.unpack(">4sII", data[:12])
+        if signature != b"DIRC" or version not in (2, 3, 4):
+            return frozenset()
+        names = []
+        name = b""
+        pos = 12
+        for _ in range(count):
+            start = pos
+            (flags,) = struct.unpack(">H", data[pos + 60 : pos + 62])
+            pos += 62
+            if version >= 3 and flags & 0x4000:
+                pos += 2
+            if version == 4:
+                # the path is stored as a suffix of the previous one
+                strip, pos = _read_offset(data, pos)
+                end = data.index(b"\0", pos)
+                name = name[: len(name) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                end = data.index(b"\0", pos)
+                name = data[pos:end]
+                # entries are padded with 1 to 8 NUL bytes
+                pos = start + ((end - start + 8) & ~7)
+            names.append(name.decode("utf-8", "surrogateescape"))
+    except (OSError, ValueError, struct.error):
+        return frozenset()
+    return frozenset(names)
+
+
+def _read_offset(data: bytes, pos: int) -> tuple[int, int]:
+    c = data[pos]
+    pos += 1
+    value = c & 0x7F
+    while c & 0x80:
+        c = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (c & 0x7F)
+    return value, pos
+
+
+def _read_patterns(path: str) -> tuple:
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return ()
+    return _compile_patterns(path, mtime)
+
+
+@cache
+def _compile_patterns(path: str, mtime: int) -> tuple:
+    try:
+        with open(path, encoding="utf-8", errors="surrogateescape") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return ()
+    return tuple(p for p in map(_compile_pattern, lines) if p)
+
+
+def _compile_pattern(line: str) -> tuple[re.Pattern, bool, bool] | None:
+    """Compile one gitignore line to a (regex, negate, dir_only) tuple."""
+    if not line or line.startswith("#"):
+        return None
+    stripped = line.rstrip(" ")
+    # trailing spaces are kept when escaped with a backslash
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    anchored = "/" in line
+    body = _translate(line.lstrip("/"))
+    if not anchored:
+        body = "(?:.*/)?" + body
+    return re.compile(f"{body}\\Z", re.DOTALL), negate, dir_only
+
+
+def _translate(pattern: str) -> str:
+    """Translate a gitignore pattern to a regular expression."""
+    i, n = 0, len(pattern)
+    result = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            j = i
+            while j < n and pattern[j] == "*":
+                j += 1
+            if (
+                j - i == 2
+                and (i == 0 or pattern[i - 1] == "/")
+                and (j == n or pattern[j] == "/")
+            ):
+                if j == n:
+                    result.append(".*")
+                else:
+                    result.append("(?:.*/)?")
+                    j += 1
+            else:
+                result.append("[^/]*")
+            i = j
+            continue
+        if c == "?":
+            result.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            j = pattern.find("]", j)
+            if j == -1:
+                result.append("\\[")
+            else:
+                chars = pattern[i + 1 : j].replace("\\", "\\\\")
+                if chars.startswith("!"):
+                    chars = "^" + chars[1:]
+                result.append(f"[{chars}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            result.append(re.escape(pattern[i]))
+        else:
+            result.append(re.escape(c))
+        i += 1
+    return "".join(result)
+
+
+class DirectoryIndex:
+    """Directory listings persisted on disk and keyed by directory mtimes.
+
+    A listing is reused as long as the directory mtime did not change, which
+    saves a ``scandir`` for every directory left untouched since the previous
+    run.
+    """
+
+    def __init__(self, root: str, path: str | None = None) -> None:
+        """Initialize a new index and load it from disk.
+
+        :param root: A string containing the absolute path of the tree indexed.
+        :param path: An optional string containing the path of the index file.
+        :return: None
+        """
+        self.root = root
+        self.path = path or index_file(root)
+        self._entries = self._load()
+        self._changed = False
+
+    def listdir(self, rel: str) -> tuple[list[str], list[str], list[str]]:
+        """Return directories, symlinked directories and files found in rel.
+
+        :param rel: A string containing a directory path relative to root.
+        :return: tuple
+        """
+        try:
+            mtime = os.stat(os.path.join(self.root, rel)).st_mtime_ns
+        except OSError:
+            return [], [], []
+
+        entry = self._entries.get(rel)
+        if entry and entry[0] == mtime:
+            return entry[1], entry[2], entry[3]
+
+        dirs, links, files = _scandir(os.path.join(self.root, rel))
+        if time.time_ns() - mtime < RACY_INTERVAL_NS:
+            mtime = None
+        self._entries[rel] = [mtime, dirs, links, files]
+        self._changed = True
+        return dirs, links, files
+
+    def save(self) -> None:
+        """Write the index back to disk when it changed."""
+        if not self._changed:
+            return
+        data = {"version": INDEX_VERSION, "entries": self._reachable()}
+        tmp = f"{self.path}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            LOG.debug("Unable to write scenario index %s: %s", self.path, e)
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+        self._changed = False
+
+    def _load(self) -> dict[str, list]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _reachable(self) -> dict[str, list]:
+        """Return entries still listed by their parent directory entry.
+
+        Entries of removed directories are dropped this way, keeping the index
+        from growing forever.
+        """
+        result = {}
+        for rel, entry in self._entries.items():
+            parent, name = os.path.split(rel)
+            parent_entry = self._entries.get(parent or ".")
+            if (
+                rel == "."
+                or not parent_entry
+                or name in parent_entry[1] + parent_entry[2]
+            ):
+                result[rel] = entry
+        return result
+
+
+def _scandir(path: str) -> tuple[list[str], list[str], list[str]]:
+    dirs, links, files = [], [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry.name)
+                elif entry.is_symlink():
+                    links.append(entry.name)
+                else:
+                    dirs.append(entry.name)
+    except OSError:
+        pass
+    return sorted(dirs), sorted(links), sorted(files)
+
+
+def index_file(root: str) -> str:
+    """Return the path of the index file used for the given root directory."""
+    digest = hashlib.sha256(root.encode()).hexdigest()[:16]
+    return os.path.join(caches.directory("discovery"), f"{digest}.json")
+
+
+def find(pattern: str, root: str | None = None) -> list[str]:
+    """Return the files matching the glob pattern, relative to root.
+
+    Unlike a plain glob, only directories that can still match the pattern
+    are visited, :data:`IGNORED_DIRECTORIES` and paths ignored by git are
+    skipped before descending into them and directory listings are reused
+    from the persistent :class:`DirectoryIndex`. Symlinked directories are
+    followed by the segments before the first ``**`` only.
+
+    :param pattern: A string containing a glob pattern relative to root.
+    :param root: An optional string containing the directory to search,
+     default is the current directory.
+    :return: list
+    """
+    segments = pattern.split("/")
+    root = os.path.abspath(root or os.getcwd())
+    gitignore = GitIgnore(root)
+    if os.path.isabs(pattern) or ".." in segments:
+        return sorted(
+            path
+            for path in glob.glob(pattern, flags=GLOB_FLAGS, root_dir=root)
+            if not gitignore.ignored(os.path.join(root, path))
+        )
+    prefix: list[str] = []
+    for segment in segments[:-1]:
+        if _MAGIC.search(segment):
+            break
+        prefix.append(segment)
+    globstar = "**" in segments
+    # like glob, symlinked directories are followed by every segment but "**",
+    # past the first "**" the segment matching a directory is not known and
+    # they are not followed
+    follow_depth = segments.index("**") if globstar else None
+    max_depth = len(segments) - 1
+    # braces may expand to a different number of path segments
+    if globstar or "{" in pattern:
+        max_depth = None
+
+    include, exclude = glob.translate(pattern, flags=GLOB_FLAGS)
+    include_re = [re.compile(r) for r in include]
+    exclude_re = [re.compile(r) for r in exclude]
+
+    start = os.path.join(*prefix) if prefix else "."
+    # ignored directories are only searched for the files tracked in them
+    hidden = gitignore.ignored(os.path.join(root, start))
+    if hidden and not gitignore.has_tracked(os.path.join(root, start)):
+        return []
+
+    index = DirectoryIndex(root)
+    results = []
+    stack = [(start, len(prefix), hidden)]
+    while stack:
+        rel, depth, hidden = stack.pop()
+        dirs, links, files = index.listdir(rel)
+        for name in files:
+            path = os.path.join(rel, name) if rel != "." else name
+            if (
+                any(r.match(path) for r in include_re)
+                and not any(r.match(path) for r in exclude_re)
+                and (
+                    gitignore.tracked(os.path.join(root, path))
+                    if hidden
+                    else not gitignore.match(os.path.join(root, path))
+                )
+            ):
+                results.append(path)
+        if max_depth is not None and depth >= max_depth:
+            continue
+        follow = follow_depth is None or depth < follow_depth
+        for name in dirs + links if follow else dirs:
+            path = os.path.join(rel, name) if rel != "." else name
+            if name in IGNORED_DIRECTORIES:
+                continue
+            ignored = hidden or gitignore.match(os.path.join(root, path), is_dir=True)
+            if not ignored or gitignore.has_tracked(os.path.join(root, path)):
+                stack.append((path, depth + 1, ignored))
+
+    index.save()
+    return sorted(results)
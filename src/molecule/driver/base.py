@@ -24,6 +24,7 @@
 from abc import ABCMeta, abstractmethod
 from importlib.metadata import version
 
+from molecule import ssh
 from molecule.status import Status
 
 
@@ -195,12 +196,14 @@ def status(self):
         return status_list
 
     def _get_ssh_connection_options(self):
+        control = ssh.connection_options(
+            self._config.scenario.ephemeral_directory,
+        ) or ["-o ControlMaster=auto", "-o ControlPersist=60s"]
         # LogLevel=ERROR is needed in order to avoid warnings like:
         # Warning: Permanently added ... to the list of known hosts.
         return [
             "-o UserKnownHostsFile=/dev/null",
-            "-o ControlMaster=auto",
-            "-o ControlPersist=60s",
+            *control,
             "-o ForwardX11=no",
             "-o LogLevel=ERROR",
             "-o IdentitiesOnly=yes",
@@ -0,0 +1,134 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Task results recorded during Ansible runs.
+
+The ``molecule_events`` callback plugin shipped with the Ansible provisioner
+appends a JSON object per task result to the file named by
+``MOLECULE_EVENTS_FILE``. Reading it is much cheaper and more reliable than
+parsing the human readable output of ``ansible-playbook``.
+"""
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+from typing import NamedTuple
+
+LOG = logging.getLogger(__name__)
+# Suffix of the file telling the callback plugin when to stop the run.
+ABORT_SUFFIX = ".abort"
+
+
+class Event(NamedTuple):
+    """The result of a task on a host."""
+
+    play: str
+    task: str
+    host: str
+    status: str
+    changed: bool
+    duration: float
+
+    def __str__(self) -> str:
+        """Return the event as reported to users."""
+        return f"* [{self.host}] => {self.task}"
+
+
+class EventReader:
+    """Read the events appended to a file since the previous read."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize a reader starting at the beginning of path.
+
+        :param path: A string containing the path of the events file.
+        :returns: None
+        """
+        self.path = path
+        self._offset = 0
+        self._partial = b""
+
+    def read(self) -> list[Event]:
+        """Return the events written since the last call.
+
+        A line still being written is kept until it is complete.
+
+        :return: list
+        """
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        self._offset += len(data)
+        *lines, self._partial = (self._partial + data).split(b"\n")
+        result = []
+        for line in lines:
+            try:
+                result.append(Event(**json.loads(line)))
+            except (ValueError, TypeError):
+                LOG.debug("Ignoring malformed event in %s: %r", self.path, line)
+        return result
+
+
+def load(path: str) -> list[Event] | None:
+    """Return all the events of path, None when no event file was written.
+
+    :param path: A string containing the path of the events file.
+    :return: list
+    """
+    if not os.path.exists(path):
+        return None
+    return EventReader(path).read()
+
+
+def clear(path: str) -> None:
+    """Remove the events of a previous run and returns None.
+
+    :param path: A string containing the path of the events file.
+    :return: None
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+def abort_after(path: str, count: int) -> None:
+    """Make the next run stop after count changed task results.
+
+    :param path: A string containing the path of the events file.
+    :param count: An int containing the number of changed task results,
+     0 lets the run complete.
+    :return: None
+    """
+    if count:
+        with open(path + ABORT_SUFFIX, "w", encoding="utf-8") as f:
+            f.write(f"{count}\n")
+    else:
+        clear(path + ABORT_SUFFIX)
+
+
+def changed(events: list[Event]) -> list[Event]:
+    """Return the events of tasks which reported a change.
+
+    :param events: A list of events.
+    :return: list
+    """
+    return [e for e in events if e.changed]
@@ -16,8 +16,10 @@
 # https://github.com/docker/compose/blob/master/compose/config/interpolation.py
 """Interpolation Module."""
 
+import functools
 import string
 from collections.abc import MutableMapping
+from typing import NamedTuple
 
 
 class InvalidInterpolation(Exception):
@@ -85,40 +87,124 @@ def interpolate(self, string: str, keep_string=None) -> str:
         except ValueError as e:
             raise InvalidInterpolation(string, e) from e
 
+    def variables(self, string: str, keep_string=None) -> frozenset[str]:
+        """Return the names of the variables the given string depends on.
+
+        Placeholders starting with ``keep_string`` are left untouched by
+        :meth:`interpolate` and therefore not reported, all the variables of
+        the other placeholders are, including their defaults.
+        """
+        return frozenset(
+            name
+            for token in _compile(self.templater, string)
+            if isinstance(token, _Variable)
+            and not (keep_string and token.named.startswith(keep_string))
+            for name in token.names
+        )
+
+    def environment_key(self, string: str, keep_string=None) -> tuple:
+        """Return a hashable snapshot of the mapping values string depends on.
+
+        Two interpolations of the same string with equal keys produce the same
+        result, which makes it suitable for keying caches of parsed configs.
+        """
+        return tuple(
+            (name, repr(self.mapping[name]) if name in self.mapping else None)
+            for name in sorted(self.variables(string, keep_string))
+        )
+
+
+class _Variable(NamedTuple):
+    """A compiled ``$named`` or ``${braced}`` placeholder."""
+
+    named: str
+    var: str
+    operator: str | None
+    default: str
+    default_var: str | None
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Return the variables the placeholder is rendered from."""
+        if self.default_var is None:
+            return (self.var,)
+        return (self.var, self.default_var)
+
+    def render(self, mapping, keep_string) -> str:
+        if keep_string and self.named.startswith(keep_string):
+            return f"${self.named}"
+        default = self.default
+        # If default is also a variable
+        if self.default_var is not None:
+            default = mapping.get(self.default_var, "")
+        if self.operator == ":-":
+            return mapping.get(self.var) or default
+        if self.operator == "-":
+            return mapping.get(self.var, default)
+        val = mapping.get(self.var, "")
+        return f"{val}"
+
+
+class _Invalid(NamedTuple):
+    """A compiled invalid placeholder, raised only when rendered."""
+
+    message: str
+
+    def render(self, mapping, keep_string) -> str:
+        raise ValueError(self.message)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(templater: type["TemplateWithDefaults"], template: str) -> tuple:
+    """Tokenize a template once and returns a tuple of tokens.
+
+    Tokens are either literal strings or placeholders having a ``render``
+    method. The result is cached per template content, for the 256 most
+    recently used ones.
+    """
+    tokens: list = []
+    position = 0
+    for mo in templater.pattern.finditer(template):
+        if mo.start() > position:
+            tokens.append(template[position : mo.start()])
+        position = mo.end()
+        named = mo.group("named") or mo.group("braced")
+        if named is not None:
+            var, operator, default = named, None, ""
+            for op in (":-", "-"):
+                if op in named:
+                    var, operator, default = named.partition(op)
+                    break
+            default_var = default[1:] if default.startswith("$") else None
+            tokens.append(_Variable(named, var, operator, default, default_var))
+        elif mo.group("escaped") is not None:
+            tokens.append(templater.delimiter)
+        else:
+            i = mo.start("invalid")
+            lines = template[:i].splitlines(keepends=True)
+            if not lines:
+                colno = 1
+                lineno = 1
+            else:
+                colno = i - len("".join(lines[:-1]))
+                lineno = len(lines)
+            tokens.append(
+                _Invalid(
+                    f"Invalid placeholder in string: line {lineno}, col {colno}",
+                ),
+            )
+    if position < len(template):
+        tokens.append(template[position:])
+    return tuple(tokens)
+
 
 class TemplateWithDefaults(string.Template):
     """TemplateWithDefaults Class."""
 
     idpattern = r"[_a-z][_a-z0-9]*(?::?-[^}]+)?"
 
-    # pylint: disable=too-many-return-statements
     def substitute(self, mapping, keep_string):
-        # Helper function for .sub()
-        def convert(mo):
-            # Check the most common path first.
-            named = mo.group("named") or mo.group("braced")
-            if named is not None:
-                if keep_string and named.startswith(keep_string):
-                    return f"${named}"
-                if ":-" in named:
-                    var, _, default = named.partition(":-")
-                    # If default is also a variable
-                    if default.startswith("$"):
-                        default = mapping.get(default[1:], "")
-                    return mapping.get(var) or default
-                if "-" in named:
-                    var, _, default = named.partition("-")
-                    # If default is also a variable
-                    if default.startswith("$"):
-                        default = mapping.get(default[1:], "")
-                    return mapping.get(var, default)
-                val = mapping.get(named, "")
-                return f"{val}"
-            if mo.group("escaped") is not None:
-                return self.delimiter
-            if mo.group("invalid") is not None:
-                self._invalid(mo)
-                return None
-            return None
-
-        return self.pattern.sub(convert, self.template)
+        return "".join(
+            token if isinstance(token, str) else token.render(mapping, keep_string)
+            for token in _compile(type(self), self.template)
+        )
@@ -0,0 +1,141 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Inter-process locks guarding scenario ephemeral directories."""
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import logging
+import os
+import time
+from typing import NamedTuple
+
+from molecule import util
+from molecule.constants import RC_TIMEOUT
+
+LOG = logging.getLogger(__name__)
+# Seconds to wait for a lock held by another process, see MOLECULE_LOCK_TIMEOUT.
+DEFAULT_TIMEOUT = 300.0
+# Upper bound of the delay between two attempts, the first ones are shorter.
+MAX_POLL_INTERVAL = 1.0
+
+
+class LockStats(NamedTuple):
+    """Contention figures recorded when a lock is acquired."""
+
+    attempts: int
+    waited: float
+
+
+class LockManager:
+    """Hold exclusive file locks until released or the process exits.
+
+    Each path is locked at most once per process, further acquisitions are
+    no-ops. While another process holds the lock, attempts are retried with
+    an exponential backoff capped at :data:`MAX_POLL_INTERVAL` until the
+    timeout expires.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a new lock manager and returns None."""
+        self._locks: dict[str, int] = {}
+        self.stats: dict[str, LockStats] = {}
+
+    def acquire(self, path: str, timeout: float | None = None) -> LockStats:
+        """Lock path, waiting for other processes to release it.
+
+        :param path: A string containing the path of the lock file.
+        :param timeout: An optional float containing the seconds to wait,
+         default is read from ``MOLECULE_LOCK_TIMEOUT``.
+        :return: LockStats
+        """
+        if path in self._locks:
+            return self.stats[path]
+        if timeout is None:
+            timeout = _timeout()
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        start = time.monotonic()
+        delay = 0.05
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError:
+                waited = time.monotonic() - start
+                if waited >= timeout:
+                    os.close(fd)
+                    LOG.warning(
+                        "Timedout trying to acquire lock on %s after %.1f seconds",
+                        path,
+                        waited,
+                    )
+                    raise SystemExit(RC_TIMEOUT) from None
+                if attempts == 1:
+                    LOG.warning("Waiting for another process to release %s", path)
+                time.sleep(min(delay, timeout - waited))
+                delay = min(delay * 2, MAX_POLL_INTERVAL)
+
+        self._locks[path] = fd
+        stats = self.stats[path] = LockStats(attempts, time.monotonic() - start)
+        if attempts > 1:
+            LOG.info(
+                "Acquired lock on %s after %.1f seconds and %s attempts",
+                path,
+                stats.waited,
+                stats.attempts,
+            )
+        return stats
+
+    def release(self, path: str) -> None:
+        """Release the lock held on path, if any, and returns None.
+
+        :param path: A string containing the path of the lock file.
+        :return: None
+        """
+        fd = self._locks.pop(path, None)
+        if fd is not None:
+            with contextlib.suppress(OSError):
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def held(self, path: str) -> bool:
+        """Return True when this process holds the lock on path."""
+        return path in self._locks
+
+
+def _timeout() -> float:
+    value = os.environ.get("MOLECULE_LOCK_TIMEOUT", str(DEFAULT_TIMEOUT))
+    try:
+        timeout = float(value)
+    except ValueError:
+        timeout = -1
+    # NaN is rejected as well, it never compares greater or equal to 0
+    if not timeout >= 0:
+        util.sysexit_with_message(
+            f"Invalid MOLECULE_LOCK_TIMEOUT '{value}', "
+            "expected a positive number of seconds.",
+        )
+    return timeout
+
+
+manager = LockManager()
@@ -23,8 +23,8 @@
 import logging
 import os
 
-from jsonschema import validate as jsonschema_validate
-from jsonschema.exceptions import ValidationError
+from ansible_compat.ports import cache
+from jsonschema.validators import validator_for
 
 from molecule import api
 from molecule.data import __file__ as data_module
@@ -32,10 +32,46 @@
 LOG = logging.getLogger(__name__)
 
 
+@cache
+def _load_validator(schema_file, mtime):
+    """Load and compile a jsonschema validator for the given schema file.
+
+    Results are cached per process, keyed by path and modification time, so
+    the schema is parsed and checked only once unless the file changes.
+    """
+    with open(schema_file, encoding="utf-8") as f:
+        schema = json.load(f)
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def _get_validator(schema_file):
+    return _load_validator(schema_file, os.path.getmtime(schema_file))
+
+
+def _format_error(exc):
+    # handle validation error for driver name
+    if exc.json_path == "$.driver.name" and exc.message.endswith(
+        (
+            "is not of type 'string'",
+            "is not valid under any of the given schemas",
+        ),
+    ):
+        wrong_driver_name = str(exc.message.split()[0])
+        driver_name_err_msg = exc.schema["messages"]["anyOf"]
+        return f"{wrong_driver_name} {driver_name_err_msg}"
+    return exc.message
+
+
 def validate(c):
-    """Perform schema validation."""
+    """Perform schema validation.
+
+    All errors found by every schema are collected and returned, in a stable
+    order, instead of stopping at the first one.
+    """
     result = []
-    schemas = []
+    seen = set()
 
     schema_files = [os.path.dirname(data_module) + "/molecule.json"]
     driver_name = c["driver"]["name"]
@@ -54,25 +90,12 @@ def validate(c):
         schema_files.append(driver_schema_file)
 
     for schema_file in schema_files:
-        with open(schema_file, encoding="utf-8") as f:
-            schema = json.load(f)
-        schemas.append(schema)
-
-    try:
-        for schema in schemas:
-            jsonschema_validate(c, schema)
-    except ValidationError as exc:
-        # handle validation error for driver name
-        if exc.json_path == "$.driver.name" and exc.message.endswith(
-            (
-                "is not of type 'string'",
-                "is not valid under any of the given schemas",
-            ),
-        ):
-            wrong_driver_name = str(exc.message.split()[0])
-            driver_name_err_msg = exc.schema["messages"]["anyOf"]
-            result.append(f"{wrong_driver_name} {driver_name_err_msg}")
-        else:
-            result.append(exc.message)
+        validator = _get_validator(schema_file)
+        for exc in sorted(validator.iter_errors(c), key=lambda e: e.json_path):
+            msg = _format_error(exc)
+            # the same error may be reported by more than one schema
+            if (exc.json_path, msg) not in seen:
+                seen.add((exc.json_path, msg))
+                result.append(msg)
 
     return result
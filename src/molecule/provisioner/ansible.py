@@ -23,19 +23,56 @@
 from __future__ import annotations
 
 import collections
-import copy
+import contextlib
+import hashlib
+import json
 import logging
 import os
 import shutil
 from typing import Any
 
+import yaml
 from ansible_compat.ports import cached_property
 
-from molecule import util
+from molecule import ssh, util
 from molecule.api import drivers
 from molecule.provisioner import ansible_playbook, ansible_playbooks, base
 
 LOG = logging.getLogger(__name__)
+# Directory of the inventory holding generated hosts and vars trees, hidden so
+# that Ansible does not read it as an inventory source.
+VARS_DIRECTORY = ".vars"
+# Symlink of the vars directory pointing to the generation in use, swapped
+# with a single rename.
+CURRENT_VARS = "current"
+# Instance count from which the "auto" inventory format switches to JSON.
+JSON_INVENTORY_THRESHOLD = 20
+# Inventory source holding the parsed scenario config as ``molecule_yml``.
+MOLECULE_VARS_FILE = "molecule_vars.yml"
+# Prefix of the hidden files holding the inventory read by the
+# molecule_inventory plugin, followed by the digest of their content.
+INVENTORY_DATA_PREFIX = ".inventory."
+# Forks per available CPU, Ansible workers mostly wait on their connection.
+FORKS_PER_CPU = 4
+# Upper bound of the computed forks.
+MAX_FORKS = 50
+
+
+class _UnsafeDumper(util.SafeDumper):
+    """Dump the string values tagged ``!unsafe``, mapping keys are left as is."""
+
+    def represent_str(self, data):
+        return self.represent_scalar("!unsafe", data)
+
+    def represent_mapping(self, tag, mapping, flow_style=None):
+        node = super().represent_mapping(tag, mapping, flow_style)
+        for key, _ in node.value:
+            if key.tag == "!unsafe":
+                key.tag = "tag:yaml.org,2002:str"
+        return node
+
+
+_UnsafeDumper.add_representer(str, _UnsafeDumper.represent_str)
 
 
 class Ansible(base.Base):
@@ -213,6 +250,19 @@ class Ansible(base.Base):
           $ephemeral_directory/modules/:$project_directory/library/:~/.ansible/plugins/modules:/usr/share/ansible/plugins/modules
         ANSIBLE_FILTER_PLUGINS:
           $ephemeral_directory/plugins/filter/:$project_directory/filter/plugins/:~/.ansible/plugins/filter:/usr/share/ansible/plugins/modules
+        ANSIBLE_CALLBACK_PLUGINS:
+          $molecule_directory/plugins/callback/:$ephemeral_directory/plugins/callback/:$project_directory/plugins/callback/:~/.ansible/plugins/callback:/usr/share/ansible/plugins/callback
+        ANSIBLE_INVENTORY_PLUGINS:
+          $molecule_directory/plugins/inventory/:$ephemeral_directory/plugins/inventory/:$project_directory/plugins/inventory/:~/.ansible/plugins/inventory:/usr/share/ansible/plugins/inventory
+
+    Directories which do not exist and duplicates are left out, except for the
+    roles and collections directories of the $ephemeral_directory, where
+    dependencies get installed.
+
+    The callback directory of Molecule holds the ``molecule_events`` plugin,
+    which records the result of each task in ``$ephemeral_directory/events.jsonl``
+    so that commands like ``idempotence`` do not have to parse the output of
+    ``ansible-playbook``.
 
     Environment variables can be passed to the provisioner.  Variables in this
     section which match the names above will be appended to the above defaults,
@@ -243,6 +293,23 @@ class Ansible(base.Base):
               scp_if_ssh: True
     ```
 
+    Setting ``MOLECULE_FACT_CACHE=true`` caches facts in
+    ``$ephemeral_directory/facts`` with ``smart`` gathering, so each host is
+    only gathered once until a playbook changes something on it. The cache
+    is cleared when a sequence starts, after a playbook reporting changed
+    tasks and by ``destroy``. Plays then skip gathering for hosts already
+    gathered, whatever their ``gather_subset``, and only see the facts of
+    the first subset gathered. Plays needing more facts have to run the
+    ``setup`` module themselves.
+
+    ``forks`` defaults to the number of instances, capped at four per CPU
+    available to Molecule divided by ``MOLECULE_CONCURRENT_SCENARIOS``, the
+    number of scenarios running at once, and at 50. When the inventory has
+    ``hosts`` or ``links``, only the caps apply. Setting
+    ``MOLECULE_ANSIBLE_STRATEGY=free`` lets hosts run ahead of each other in
+    plays which do not set their own ``strategy``. Both values are reported
+    with ``--debug``.
+
     !!! note
 
         The following keys are disallowed to prevent Molecule from
@@ -366,6 +433,27 @@ class Ansible(base.Base):
               hosts: ../../../inventory/hosts
     ```
 
+    Generated inventory files are written as YAML, or as JSON which Ansible
+    parses much faster, from 20 platforms on. The ``format`` key forces one
+    of them.
+
+    ``` yaml
+        provisioner:
+          name: ansible
+          inventory:
+            format: json  # auto (default), json, yaml or plugin
+    ```
+
+    With the ``plugin`` format nothing but a small configuration file for the
+    ``molecule_inventory`` inventory plugin shipped with Molecule is written
+    in place of the inventory. The groups, hosts and variables, including
+    ``hosts``, ``host_vars`` and ``group_vars``, are serialized in a single
+    JSON file named after the digest of its content, and no file is written
+    per host or group. Variables from ``host_vars`` and ``group_vars`` then
+    have the precedence of inventory file variables. The inventory cache of
+    Ansible can be enabled with ``ANSIBLE_INVENTORY_CACHE=True``, entries are
+    keyed by the digest.
+
     Override connection options:
 
     ``` yaml
@@ -425,11 +513,11 @@ def __init__(self, config) -> None:
     @property
     def default_config_options(self) -> dict[str, Any]:
         """Provide Default options to construct ansible.cfg and returns a dict."""
-        return {
+        d = {
             "defaults": {
                 "ansible_managed": "Ansible managed: Do NOT edit this file manually!",
                 "display_failed_stderr": True,
-                "forks": 50,
+                "forks": self.forks,
                 "retry_files_enabled": False,
                 "host_key_checking": False,
                 "nocows": 1,
@@ -440,6 +528,105 @@ def default_config_options(self) -> dict[str, Any]:
                 "control_path": "%(directory)s/%%h-%%p-%%r",
             },
         }
+        if self.strategy:
+            d["defaults"]["strategy"] = self.strategy
+        if self.fact_caching:
+            d["defaults"].update(
+                {
+                    "gathering": "smart",
+                    "fact_caching": "jsonfile",
+                    "fact_caching_connection": self.fact_cache_directory,
+                    "fact_caching_timeout": 0,
+                },
+            )
+        if ssh.usable(self._config.scenario.ephemeral_directory):
+            d["ssh_connection"].update(
+                {
+                    "control_path_dir": ssh.control_directory(
+                        self._config.scenario.ephemeral_directory,
+                    ),
+                    "control_path": "%(directory)s/%%C",
+                    "ssh_args": "-C -o ControlMaster=auto "
+                    f"-o ControlPersist={ssh.CONTROL_PERSIST}",
+                },
+            )
+        if self.pipelining:
+            d["ssh_connection"]["pipelining"] = True
+
+        return d
+
+    @cached_property
+    def forks(self) -> int:
+        """Return the forks fitting the instances and the controller.
+
+        Each instance gets a fork, within :data:`FORKS_PER_CPU` per available
+        CPU shared by the scenarios running concurrently, as told by
+        ``MOLECULE_CONCURRENT_SCENARIOS``. Hosts added by the ``hosts`` or
+        ``links`` of the inventory are not known in advance, the number of
+        instances is then not a bound.
+
+        :return: int
+        """
+        value = os.environ.get("MOLECULE_CONCURRENT_SCENARIOS", "1")
+        if not value.isdigit() or int(value) < 1:
+            util.sysexit_with_message(
+                f"Invalid MOLECULE_CONCURRENT_SCENARIOS '{value}', "
+                "expected a positive number.",
+            )
+        scenarios = int(value)
+        if hasattr(os, "sched_getaffinity"):
+            cpus = len(os.sched_getaffinity(0))
+        else:  # pragma: no cover
+            cpus = os.cpu_count() or 1
+        instances = len(self._config.platforms.instances)
+        forks = min(cpus * FORKS_PER_CPU // scenarios, MAX_FORKS)
+        if not self.hosts and not self.links:
+            forks = min(instances, forks)
+        forks = max(1, forks)
+        LOG.debug(
+            "Using %d Ansible forks for %d instances, %d CPUs and %d concurrent "
+            "scenarios",
+            forks,
+            instances,
+            cpus,
+            scenarios,
+        )
+        return forks
+
+    @cached_property
+    def strategy(self) -> str | None:
+        """Return the strategy requested by ``MOLECULE_ANSIBLE_STRATEGY``.
+
+        Plays which set their own strategy keep it.
+
+        :return: str or None for the default of Ansible.
+        """
+        strategy = os.environ.get("MOLECULE_ANSIBLE_STRATEGY") or None
+        if strategy:
+            LOG.debug("Using the %s Ansible strategy by default", strategy)
+        return strategy
+
+    @cached_property
+    def fact_caching(self) -> bool:
+        """Return True when ``MOLECULE_FACT_CACHE`` enables the fact cache.
+
+        :return: bool
+        """
+        return util.boolean(
+            os.environ.get("MOLECULE_FACT_CACHE", "false"),
+            strict=False,
+        )
+
+    @cached_property
+    def pipelining(self) -> bool:
+        """Return True when ``MOLECULE_SSH_PIPELINING`` enables pipelining.
+
+        :return: bool
+        """
+        return util.boolean(
+            os.environ.get("MOLECULE_SSH_PIPELINING", "false"),
+            strict=False,
+        )
 
     @property
     def default_options(self):
@@ -461,11 +648,10 @@ def default_env(self):
         # isolating test environment by injects ephemeral scenario directory on
         # top of the collection_path_list. This prevents dependency commands
         # from installing dependencies to user list of collections.
-        collections_path_list = [
-            util.abs_path(
-                os.path.join(self._config.scenario.ephemeral_directory, "collections"),
-            ),
-        ]
+        ephemeral_collections = util.abs_path(
+            os.path.join(self._config.scenario.ephemeral_directory, "collections"),
+        )
+        collections_path_list = [ephemeral_collections]
         if collection_indicator in self._config.project_directory:
             collection_path, right = self._config.project_directory.rsplit(
                 collection_indicator,
@@ -492,10 +678,11 @@ def default_env(self):
                 ),
             )
 
+        ephemeral_roles = util.abs_path(
+            os.path.join(self._config.scenario.ephemeral_directory, "roles"),
+        )
         roles_path_list = [
-            util.abs_path(
-                os.path.join(self._config.scenario.ephemeral_directory, "roles"),
-            ),
+            ephemeral_roles,
             util.abs_path(os.path.join(self._config.project_directory, os.path.pardir)),
             util.abs_path(os.path.join(os.path.expanduser("~"), ".ansible", "roles")),
             "/usr/share/ansible/roles",
@@ -507,46 +694,70 @@ def default_env(self):
                 list(map(util.abs_path, os.environ["ANSIBLE_ROLES_PATH"].split(":"))),
             )
 
-        env = util.merge_dicts(
+        # like roles and collections, content may be added there later on
+        ephemeral_library = util.abs_path(
+            os.path.join(self._config.scenario.ephemeral_directory, "library"),
+        )
+        ephemeral_filter = util.abs_path(
+            os.path.join(
+                self._config.scenario.ephemeral_directory,
+                "plugins",
+                "filter",
+            ),
+        )
+        paths = {
+            "ANSIBLE_ROLES_PATH": self._prune_paths(
+                roles_path_list,
+                keep=[ephemeral_roles],
+            ),
+            self._config.ansible_collections_path: self._prune_paths(
+                collections_path_list,
+                keep=[ephemeral_collections],
+            ),
+            "ANSIBLE_LIBRARY": self._prune_paths(
+                self._get_modules_directories(),
+                keep=[ephemeral_library],
+            ),
+            "ANSIBLE_CALLBACK_PLUGINS": self._prune_paths(
+                self._get_plugin_type_directories("callback"),
+            ),
+            "ANSIBLE_INVENTORY_PLUGINS": self._prune_paths(
+                self._get_plugin_type_directories("inventory"),
+            ),
+            "ANSIBLE_FILTER_PLUGINS": self._prune_paths(
+                [
+                    self._get_filter_plugin_directory(),
+                    ephemeral_filter,
+                    util.abs_path(
+                        os.path.join(
+                            self._config.project_directory,
+                            "plugins",
+                            "filter",
+                        ),
+                    ),
+                    util.abs_path(
+                        os.path.join(
+                            os.path.expanduser("~"),
+                            ".ansible",
+                            "plugins",
+                            "filter",
+                        ),
+                    ),
+                    "/usr/share/ansible/plugins/filter",
+                ],
+                keep=[ephemeral_filter],
+            ),
+        }
+
+        return util.layered_env(
             os.environ,
             {
                 "ANSIBLE_CONFIG": self._config.provisioner.config_file,
-                "ANSIBLE_ROLES_PATH": ":".join(roles_path_list),
-                self._config.ansible_collections_path: ":".join(collections_path_list),
-                "ANSIBLE_LIBRARY": ":".join(self._get_modules_directories()),
-                "ANSIBLE_FILTER_PLUGINS": ":".join(
-                    [
-                        self._get_filter_plugin_directory(),
-                        util.abs_path(
-                            os.path.join(
-                                self._config.scenario.ephemeral_directory,
-                                "plugins",
-                                "filter",
-                            ),
-                        ),
-                        util.abs_path(
-                            os.path.join(
-                                self._config.project_directory,
-                                "plugins",
-                                "filter",
-                            ),
-                        ),
-                        util.abs_path(
-                            os.path.join(
-                                os.path.expanduser("~"),
-                                ".ansible",
-                                "plugins",
-                                "filter",
-                            ),
-                        ),
-                        "/usr/share/ansible/plugins/filter",
-                    ],
-                ),
+                # an empty path would make Ansible search the current directory
+                **{key: ":".join(value) for key, value in paths.items() if value},
             },
+            self._config.env,
         )
-        env = util.merge_dicts(env, self._config.env)
-
-        return env
 
     @property
     def name(self):
@@ -578,30 +789,30 @@ def options(self):
 
     @property
     def env(self):
+        return self._config.cached_env("provisioner", self._get_env)
+
+    def _get_env(self):
         default_env = self.default_env
         env = self._config.config["provisioner"]["env"].copy()
         # ensure that all keys and values are strings
         env = {str(k): str(v) for k, v in env.items()}
 
-        library_path = default_env["ANSIBLE_LIBRARY"]
-        filter_plugins_path = default_env["ANSIBLE_FILTER_PLUGINS"]
-
-        try:
-            path = self._absolute_path_for(env, "ANSIBLE_LIBRARY")
-            library_path = f"{library_path}:{path}"
-        except KeyError:
-            pass
-
-        try:
-            path = self._absolute_path_for(env, "ANSIBLE_FILTER_PLUGINS")
-            filter_plugins_path = f"{filter_plugins_path}:{path}"
-        except KeyError:
-            pass
-
-        env["ANSIBLE_LIBRARY"] = library_path
-        env["ANSIBLE_FILTER_PLUGINS"] = filter_plugins_path
-
-        return util.merge_dicts(default_env, env)
+        for key in (
+            "ANSIBLE_LIBRARY",
+            "ANSIBLE_FILTER_PLUGINS",
+            "ANSIBLE_CALLBACK_PLUGINS",
+            "ANSIBLE_INVENTORY_PLUGINS",
+        ):
+            paths = [default_env.get(key, "")]
+            if key in env:
+                paths.append(self._absolute_path_for(env, key))
+            path = ":".join(filter(None, paths))
+            if path:
+                env[key] = path
+            else:
+                env.pop(key, None)
+
+        return default_env.layer(env)
 
     @property
     def hosts(self):
@@ -642,21 +853,24 @@ def inventory(self):
                 instance-2:
                   ansible_connection: docker
         ```
+
+        The ``molecule_*`` variables hold plain values, the parsed scenario
+        config is provided as ``molecule_yml`` by the ``molecule_vars.yml``
+        inventory source written next to the inventory.
         """
         dd = self._vivify()
+        molecule_vars = {
+            "molecule_file": self._config.config_file,
+            "molecule_ephemeral_directory": self._config.scenario.ephemeral_directory,
+            "molecule_scenario_directory": self._config.scenario.directory,
+            "molecule_instance_config": self._config.driver.instance_config,
+            "molecule_no_log": "{{ lookup('env', 'MOLECULE_NO_LOG') or not "
+            "molecule_yml.provisioner.log|default(False) | bool }}",
+        }
         for platform in self._config.platforms.instances:
             for group in platform.get("groups", ["ungrouped"]):
                 instance_name = platform["name"]
                 connection_options = self.connection_options(instance_name)
-                molecule_vars = {
-                    "molecule_file": "{{ lookup('env', 'MOLECULE_FILE') }}",
-                    "molecule_ephemeral_directory": "{{ lookup('env', 'MOLECULE_EPHEMERAL_DIRECTORY') }}",
-                    "molecule_scenario_directory": "{{ lookup('env', 'MOLECULE_SCENARIO_DIRECTORY') }}",
-                    "molecule_yml": "{{ lookup('file', molecule_file) | from_yaml }}",
-                    "molecule_instance_config": "{{ lookup('env', 'MOLECULE_INSTANCE_CONFIG') }}",
-                    "molecule_no_log": "{{ lookup('env', 'MOLECULE_NO_LOG') or not "
-                    "molecule_yml.provisioner.log|default(False) | bool }}",
-                }
 
                 # All group
                 dd["all"]["hosts"][instance_name] = connection_options
@@ -678,14 +892,39 @@ def inventory(self):
     def inventory_directory(self):
         return self._config.scenario.inventory_directory
 
+    @property
+    def inventory_format(self):
+        """Return the serialization of generated inventory files.
+
+        :return: str, either ``yaml``, ``json`` or ``plugin``.
+        """
+        fmt = self._config.config["provisioner"]["inventory"].get("format", "auto")
+        if fmt == "auto":
+            if len(self._config.platforms.instances) >= JSON_INVENTORY_THRESHOLD:
+                return "json"
+            return "yaml"
+        return fmt
+
     @property
     def inventory_file(self):
         return os.path.join(self.inventory_directory, "ansible_inventory.yml")
 
+    @property
+    def molecule_vars_file(self):
+        return os.path.join(self.inventory_directory, MOLECULE_VARS_FILE)
+
     @property
     def config_file(self):
         return os.path.join(self._config.scenario.ephemeral_directory, "ansible.cfg")
 
+    @property
+    def fact_cache_directory(self):
+        return os.path.join(self._config.scenario.ephemeral_directory, "facts")
+
+    @property
+    def events_file(self):
+        return os.path.join(self._config.scenario.ephemeral_directory, "events.jsonl")
+
     @cached_property
     def playbooks(self):
         return ansible_playbooks.AnsiblePlaybooks(self._config)
@@ -710,6 +949,15 @@ def cleanup(self):
         pb = self._get_ansible_playbook(self.playbooks.cleanup)
         pb.execute()
 
+    def clear_facts(self):
+        """Remove the facts cached by previous runs and returns None.
+
+        :return: None
+        """
+        if os.path.isdir(self.fact_cache_directory):
+            LOG.debug("Clearing the fact cache %s", self.fact_cache_directory)
+            shutil.rmtree(self.fact_cache_directory, ignore_errors=True)
+
     def connection_options(self, instance_name):
         d = self._config.driver.ansible_connection_options(instance_name)
 
@@ -819,6 +1067,9 @@ def write_config(self):
 
         :return: None
         """
+        if ssh.enabled():
+            # ansible.cfg only points to the control directory once it exists
+            ssh.prepare(self._config.scenario.ephemeral_directory)
         template = util.render_template(
             self._get_config_template(),
             config_options=self.config_options,
@@ -831,11 +1082,11 @@ def manage_inventory(self):
         :returns: None
         """
         self._write_inventory()
-        self._remove_vars()
-        if not self.links:
-            self._add_or_update_vars()
-        else:
+        self._remove_vars(keep=self._current_vars())
+        if self.links:
             self._link_or_update_vars()
+        elif self.inventory_format != "plugin":
+            self._add_or_update_vars()
 
     def abs_path(self, path: str) -> str | None:
         return util.abs_path(os.path.join(self._config.scenario.directory, path))
@@ -843,54 +1094,240 @@ def abs_path(self, path: str) -> str | None:
     def _add_or_update_vars(self):
         """Create host and/or group vars and returns None.
 
+        The files are staged in a directory named after the digest of their
+        content, then a single ``current`` symlink, which the ``hosts``,
+        ``host_vars`` and ``group_vars`` symlinks go through, is swapped to it
+        with a rename. Nothing is written when the digest did not change and
+        a concurrent ansible-playbook never sees a partially written tree or
+        files from two generations.
+
         :returns: None
         """
-        # Create the hosts extra inventory source (only if not empty)
-        hosts_file = os.path.join(self.inventory_directory, "hosts")
-        if self.hosts:
-            util.write_file(hosts_file, util.safe_dump(self.hosts))
-        # Create the host_vars and group_vars directories
-        for target in ["host_vars", "group_vars"]:
-            if target == "host_vars":
-                vars_target = copy.deepcopy(self.host_vars)
-                for instance_name in self.host_vars.keys():
-                    instance_key = instance_name
-                    vars_target[instance_key] = vars_target.pop(instance_name)
+        tree = {
+            name: content
+            for name, content in (
+                ("hosts", self.hosts),
+                ("host_vars", self.host_vars),
+                ("group_vars", self.group_vars),
+            )
+            if content
+        }
+        if not tree:
+            return
 
-            elif target == "group_vars":
-                vars_target = self.group_vars
+        generations = os.path.join(self.inventory_directory, VARS_DIRECTORY)
+        digest = hashlib.sha256(
+            json.dumps(
+                [self.inventory_format, tree],
+                sort_keys=True,
+                default=str,
+            ).encode(),
+        ).hexdigest()[:16]
+        generation = os.path.join(generations, digest)
+        if not os.path.isdir(generation):
+            self._stage_vars(tree, generation)
+
+        self._swap_symlink(digest, os.path.join(generations, CURRENT_VARS))
+        for name in tree:
+            self._swap_symlink(
+                os.path.join(VARS_DIRECTORY, CURRENT_VARS, name),
+                os.path.join(self.inventory_directory, name),
+            )
 
-            if vars_target:
-                target_vars_directory = os.path.join(self.inventory_directory, target)
+        # keep the previous generation for playbooks still reading it
+        previous = sorted(
+            (
+                os.path.join(generations, d)
+                for d in os.listdir(generations)
+                if d != CURRENT_VARS
+            ),
+            key=os.path.getmtime,
+        )
+        for path in previous[:-2]:
+            if path != generation:
+                shutil.rmtree(path, ignore_errors=True)
 
-                if not os.path.isdir(util.abs_path(target_vars_directory)):
-                    os.mkdir(util.abs_path(target_vars_directory))
+    def _swap_symlink(self, source, target):
+        """Point the target symlink to source with a rename and returns None.
 
-                for target in vars_target:
-                    target_var_content = vars_target[target]
-                    path = os.path.join(util.abs_path(target_vars_directory), target)
-                    util.write_file(path, util.safe_dump(target_var_content))
+        :param source: A string containing the path the symlink points to.
+        :param target: A string containing the path of the symlink.
+        :returns: None
+        """
+        if os.path.islink(target) and os.readlink(target) == source:
+            return
+        tmp = f"{target}.{os.getpid()}"
+        # left behind by an interrupted process which had the same pid
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        os.symlink(source, tmp)
+        os.replace(tmp, target)
+
+    def _stage_vars(self, tree, generation):
+        """Write the vars tree to a temporary directory renamed to generation.
+
+        :param tree: A dict of inventory vars keyed by file or directory name.
+        :param generation: A string containing the path of the directory.
+        :returns: None
+        """
+        staging = f"{generation}.{os.getpid()}.tmp"
+        os.makedirs(staging)
+        for name, content in tree.items():
+            path = os.path.join(staging, name)
+            if name == "hosts":
+                self._write_inventory_file(path, content)
+                continue
+            os.mkdir(path)
+            for target, target_var_content in content.items():
+                self._write_inventory_file(
+                    os.path.join(path, target),
+                    target_var_content,
+                )
+        try:
+            os.rename(staging, generation)
+        except OSError:
+            # another process staged the same content meanwhile
+            shutil.rmtree(staging, ignore_errors=True)
 
     def _write_inventory(self):
-        """Write the provisioner's inventory file to disk and returns None.
+        """Write the provisioner's inventory files to disk and returns None.
+
+        The scenario config is written once as data, Ansible would otherwise
+        read and parse molecule.yml each time a host or a task templates
+        ``molecule_yml``. Its strings are tagged ``!unsafe``, like the file
+        lookup used to return them, so Ansible never templates them.
 
         :return: None
         """
         self._verify_inventory()
 
-        util.write_file(self.inventory_file, util.safe_dump(self.inventory))
+        if self.inventory_format == "plugin":
+            self._write_inventory_data()
+            return
+
+        self._remove_inventory_data()
+        self._write_inventory_file(self.inventory_file, self.inventory)
+        util.write_file(
+            self.molecule_vars_file,
+            yaml.dump(
+                {"all": {"vars": {"molecule_yml": self._config.config}}},
+                Dumper=_UnsafeDumper,
+                default_flow_style=False,
+            ),
+            header="",
+        )
+
+    def _write_inventory_data(self):
+        """Serialize the inventory for the molecule_inventory plugin.
+
+        The data is written to a file named after its digest, then the
+        configuration file of the plugin is replaced to point to it, so that
+        a running ansible-playbook reads either the previous or the new
+        inventory.
+
+        :return: None
+        """
+        data = {
+            "inventories": [self.inventory],
+            "host_vars": {},
+            "group_vars": {},
+            "molecule_yml": self._config.config,
+        }
+        if not self.links:
+            if self.hosts:
+                data["inventories"].append(self.hosts)
+            data["host_vars"] = self.host_vars
+            data["group_vars"] = self.group_vars
+        content = json.dumps(data, sort_keys=True, default=str)
+        digest = hashlib.sha256(content.encode()).hexdigest()[:16]
+        name = f"{INVENTORY_DATA_PREFIX}{digest}.json"
+
+        path = os.path.join(self.inventory_directory, name)
+        if not os.path.exists(path):
+            self._replace_file(path, content)
+        config = util.molecule_prepender(
+            util.safe_dump(
+                {"plugin": "molecule_inventory", "data": name, "digest": digest},
+            ),
+        )
+        try:
+            with open(self.inventory_file, encoding="utf-8") as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != config:
+            self._replace_file(self.inventory_file, config)
+        if os.path.exists(self.molecule_vars_file):
+            os.unlink(self.molecule_vars_file)
+        self._remove_inventory_data(keep=name)
+
+    def _replace_file(self, path, content):
+        """Write content to a temporary file renamed to path.
+
+        :param path: A string containing the path of the file.
+        :param content: A string containing the data to be written.
+        :return: None
+        """
+        tmp = f"{path}.{os.getpid()}"
+        util.write_file(tmp, content, header="")
+        os.replace(tmp, path)
+
+    def _remove_inventory_data(self, keep=None):
+        """Remove data files of the molecule_inventory plugin and returns None.
+
+        :param keep: An optional string containing the name of the current
+         data file, which is kept along with the previous one.
+        :return: None
+        """
+        if not os.path.isdir(self.inventory_directory):
+            return
+        previous = sorted(
+            (
+                os.path.join(self.inventory_directory, name)
+                for name in os.listdir(self.inventory_directory)
+                if name.startswith(INVENTORY_DATA_PREFIX) and name != keep
+            ),
+            key=os.path.getmtime,
+        )
+        # keep the previous data for playbooks still reading it
+        for path in previous[:-1] if keep else previous:
+            os.unlink(path)
+
+    def _write_inventory_file(self, path, data):
+        """Write data to an inventory file in the configured format.
+
+        JSON is valid YAML that Ansible loads with its JSON decoder before
+        trying the much slower YAML parser. It is written without the
+        molecule header, a comment would make it fall back to YAML.
 
-    def _remove_vars(self):
+        :param path: A string containing the path of the file.
+        :param data: The data to serialize.
+        :return: None
+        """
+        if self.inventory_format == "json":
+            util.write_file(path, json.dumps(data, default=str) + "\n", header="")
+        else:
+            util.write_file(path, util.safe_dump(data))
+
+    def _remove_vars(self, keep=()):
         """Remove hosts/host_vars/group_vars and returns None.
 
+        :param keep: An optional iterable of names to leave in place.
         :returns: None
         """
         for name in ("hosts", "group_vars", "host_vars"):
+            if name in keep:
+                continue
             d = os.path.join(self.inventory_directory, name)
             if os.path.islink(d) or os.path.isfile(d):
                 os.unlink(d)
             elif os.path.isdir(d):
                 shutil.rmtree(d)
+        if self.links or not keep:
+            shutil.rmtree(
+                os.path.join(self.inventory_directory, VARS_DIRECTORY),
+                ignore_errors=True,
+            )
 
     def _link_or_update_vars(self):
         """Create or updates the symlink to group_vars and returns None.
@@ -904,10 +1341,40 @@ def _link_or_update_vars(self):
             if not os.path.exists(source):
                 msg = f"The source path '{source}' does not exist."
                 util.sysexit_with_message(msg)
+            if os.path.islink(target) and os.readlink(target) == source:
+                continue
             msg = f"Inventory {source} linked to {target}"
             LOG.debug(msg)
             os.symlink(source, target)
 
+    def _current_vars(self):
+        """Return the names of inventory vars already in the expected form.
+
+        Those are replaced atomically instead of being removed and created
+        again.
+
+        :returns: list
+        """
+        current = []
+        for name in ("hosts", "group_vars", "host_vars"):
+            d = os.path.join(self.inventory_directory, name)
+            if self.links:
+                source = self.links.get(name)
+                if source is None or not os.path.islink(d):
+                    continue
+                source = os.path.join(self._config.scenario.directory, source)
+                if os.readlink(d) == source:
+                    current.append(name)
+            elif (
+                self.inventory_format != "plugin"
+                and getattr(self, name)
+                and os.path.islink(d)
+                and os.readlink(d).startswith(VARS_DIRECTORY + os.sep)
+            ):
+                # swapped for the new generation by _add_or_update_vars
+                current.append(name)
+        return current
+
     def _get_ansible_playbook(self, playbook, verify=False, **kwargs):
         """Get an instance of AnsiblePlaybook and returns it.
 
@@ -1001,6 +1468,84 @@ def _get_modules_directories(self) -> list[str]:
 
         return [path for path in paths if path is not None]
 
+    def _get_plugin_type_directories(self, plugin_type: str) -> list[str]:
+        """Return list of ansible plugin directories of a plugin type.
+
+        Adds the directory of molecule, which holds the ``molecule_events``
+        callback and ``molecule_inventory`` inventory plugins, after the
+        directories of ``$ANSIBLE_<TYPE>_PLUGINS`` and before the default
+        locations.
+
+        :param plugin_type: A string containing the type of plugin, such as
+         ``callback``.
+        """
+        variable = f"ANSIBLE_{plugin_type.upper()}_PLUGINS"
+        paths: list[str] = []
+        if os.environ.get(variable):
+            paths = list(map(util.abs_path, os.environ[variable].split(":")))
+
+        paths.extend(
+            [
+                util.abs_path(os.path.join(self._get_plugin_directory(), plugin_type)),
+                util.abs_path(
+                    os.path.join(
+                        self._config.scenario.ephemeral_directory,
+                        "plugins",
+                        plugin_type,
+                    ),
+                ),
+                util.abs_path(
+                    os.path.join(
+                        self._config.project_directory,
+                        "plugins",
+                        plugin_type,
+                    ),
+                ),
+                util.abs_path(
+                    os.path.join(
+                        os.path.expanduser("~"),
+                        ".ansible",
+                        "plugins",
+                        plugin_type,
+                    ),
+                ),
+                f"/usr/share/ansible/plugins/{plugin_type}",
+            ],
+        )
+
+        return paths
+
+    def _prune_paths(
+        self,
+        paths: list[str | None],
+        keep: list[str | None] | None = None,
+    ) -> list[str]:
+        """Return the paths which exist, without duplicates.
+
+        Ansible would otherwise stat and scan every one of these directories
+        at each run. The paths are checked each time the environment is built,
+        so a directory created meanwhile is picked up once the cached
+        environment is invalidated.
+
+        :param paths: A list of absolute paths, in order of precedence.
+        :param keep: A list of paths to keep even when they do not exist yet.
+        :return: list
+        """
+        seen = set()
+        result = []
+        for path in paths:
+            if not path:
+                continue
+            real = os.path.realpath(path)
+            if real in seen:
+                continue
+            seen.add(real)
+            if path in (keep or []) or os.path.isdir(path):
+                result.append(path)
+            else:
+                LOG.debug("Skipping missing path %s", path)
+        return result
+
     def _get_filter_plugin_directory(self):
         return util.abs_path(os.path.join(self._get_plugin_directory(), "filter"))
 
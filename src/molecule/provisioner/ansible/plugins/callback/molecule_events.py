@@ -0,0 +1,117 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Ansible callback plugin writing task results for Molecule."""
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = """
+    name: molecule_events
+    type: notification
+    short_description: Write task results as JSON lines for Molecule
+    description:
+      - Appends a JSON object per task result to the file named by
+        C(MOLECULE_EVENTS_FILE), with the play, task, host, status, changed
+        flag and duration in seconds.
+      - Does nothing when C(MOLECULE_EVENTS_FILE) is not set.
+      - When the file named after it with an C(.abort) suffix holds a number,
+        the run stops with return code 6 once that many task results
+        reported a change.
+"""
+
+# Return code of runs stopped on purpose, see molecule.constants.RC_ABORTED.
+RC_ABORTED = 6
+
+
+class CallbackModule(CallbackBase):
+    """Write an event per task result to ``MOLECULE_EVENTS_FILE``."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "notification"
+    CALLBACK_NAME = "molecule_events"
+    CALLBACK_NEEDS_ENABLED = False
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        path = os.environ.get("MOLECULE_EVENTS_FILE")
+        self._file = open(path, "a", encoding="utf-8") if path else None
+        self._play = ""
+        self._started: dict[tuple[str, str], float] = {}
+        self._changed = 0
+        self._abort_after = 0
+        if path and os.path.exists(f"{path}.abort"):
+            with open(f"{path}.abort", encoding="utf-8") as f:
+                self._abort_after = int(f.read().strip() or 0)
+
+    def v2_playbook_on_play_start(self, play) -> None:
+        self._play = play.get_name().strip()
+
+    def v2_runner_on_start(self, host, task) -> None:
+        self._started[(host.get_name(), task._uuid)] = time.monotonic()
+
+    def v2_runner_on_ok(self, result) -> None:
+        self._write(result, "changed" if result._result.get("changed") else "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False) -> None:
+        self._write(result, "ignored" if ignore_errors else "failed")
+
+    def v2_runner_on_skipped(self, result) -> None:
+        self._write(result, "skipped")
+
+    def v2_runner_on_unreachable(self, result) -> None:
+        self._write(result, "unreachable")
+
+    def v2_playbook_on_stats(self, stats) -> None:
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, result, status: str) -> None:
+        if not self._file:
+            return
+        host = result._host.get_name()
+        task = result._task
+        started = self._started.pop((host, task._uuid), None)
+        event = {
+            "play": self._play,
+            "task": task.get_name().strip(),
+            "host": host,
+            "status": status,
+            # failed and ignored results may report a change as well
+            "changed": status == "changed",
+            "duration": round(time.monotonic() - started, 3) if started else 0.0,
+        }
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+        if event["changed"]:
+            self._changed += 1
+            if self._abort_after and self._changed >= self._abort_after:
+                self._file.close()
+                self._file = None
+                self._display.warning(
+                    f"Stopping the run after {self._changed} changed task results.",
+                )
+                # exceptions other than SystemExit are only logged by Ansible
+                raise SystemExit(RC_ABORTED)
@@ -0,0 +1,114 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Ansible inventory plugin reading the inventory serialized by Molecule."""
+from __future__ import annotations
+
+import json
+import os
+
+from ansible.errors import AnsibleParserError
+from ansible.plugins.inventory import Cacheable
+from ansible.plugins.inventory.yaml import InventoryModule as YamlInventoryModule
+from ansible.utils.unsafe_proxy import wrap_var
+
+DOCUMENTATION = """
+    name: molecule_inventory
+    short_description: Inventory generated by Molecule
+    description:
+      - Reads the groups, hosts and variables Molecule serialized to a single
+        JSON file next to the configuration file.
+      - The scenario config is set as C(molecule_yml) on the C(all) group,
+        marked unsafe so that Ansible never templates it.
+      - The file name holds the digest of its content, which is also used as
+        part of the cache key when the inventory cache is enabled.
+    extends_documentation_fragment:
+      - inventory_cache
+    options:
+      plugin:
+        description: Token that ensures this is a source file for the plugin.
+        required: true
+        choices: ["molecule_inventory"]
+      data:
+        description: Name of the JSON file, relative to the configuration file.
+        required: true
+        type: str
+      digest:
+        description: Digest of the content of the JSON file.
+        required: true
+        type: str
+"""
+
+
+class InventoryModule(YamlInventoryModule, Cacheable):
+    """Populate the inventory from the data serialized by Molecule."""
+
+    NAME = "molecule_inventory"
+
+    def verify_file(self, path) -> bool:
+        return super(YamlInventoryModule, self).verify_file(path) and path.endswith(
+            (".yml", ".yaml"),
+        )
+
+    def parse(self, inventory, loader, path, cache=True) -> None:
+        super(YamlInventoryModule, self).parse(inventory, loader, path)
+        self._read_config_data(path)
+
+        cache_key = f"{self.get_cache_key(path)}_{self.get_option('digest')}"
+        use_cache = self.get_option("cache") and cache
+        update_cache = self.get_option("cache") and not cache
+        data = None
+        if use_cache:
+            try:
+                data = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+        if data is None:
+            data = self._load(
+                os.path.join(os.path.dirname(path), self.get_option("data")),
+            )
+        if update_cache:
+            self._cache[cache_key] = data
+
+        for tree in data["inventories"]:
+            for group_name, group_data in tree.items():
+                self._parse_group(group_name, group_data)
+        # the scenario config is data, never templated by Ansible
+        self.inventory.set_variable(
+            "all",
+            "molecule_yml",
+            wrap_var(data["molecule_yml"]),
+        )
+        for group_name, variables in data["group_vars"].items():
+            if group_name in self.inventory.groups:
+                for key, value in variables.items():
+                    self.inventory.set_variable(group_name, key, value)
+        for host_name, variables in data["host_vars"].items():
+            # also resolves the implicit localhost
+            host = self.inventory.get_host(host_name)
+            if host is not None:
+                for key, value in variables.items():
+                    host.set_variable(key, value)
+
+    def _load(self, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise AnsibleParserError(f"Unable to read {path}: {e}") from e
@@ -23,8 +23,10 @@
 import shlex
 import warnings
 
-from molecule import util
+from molecule import events, util
 from molecule.api import MoleculeRuntimeWarning
+from molecule.constants import RC_ABORTED
+from molecule.provisioner import executor
 
 LOG = logging.getLogger(__name__)
 
@@ -32,7 +34,7 @@
 class AnsiblePlaybook:
     """Provisioner Playbook."""
 
-    def __init__(self, playbook, config, verify=False) -> None:
+    def __init__(self, playbook, config, verify=False, abort_after=0) -> None:
         """Set up the requirements to execute ``ansible-playbook`` and returns \
         None.
 
@@ -40,19 +42,23 @@ def __init__(self, playbook, config, verify=False) -> None:
         :param config: An instance of a Molecule config.
         :param verify: An optional bool to toggle the Plabook mode between
          provision and verify. False: provision; True: verify. Default is False.
+        :param abort_after: An optional int telling to stop the run after that
+         many changed task results. Default is 0, the run completes.
         :returns: None
         """
         self._ansible_command = None
+        self._abort_after = abort_after
         self._playbook = playbook
         self._config = config
         self._cli = {}  # type: ignore
         if verify:
-            self._env = util.merge_dicts(
+            self._env = util.layered_env(
                 self._config.verifier.env,
                 self._config.config["verifier"]["env"],
             )
         else:
-            self._env = self._config.provisioner.env
+            # top layer owned by this playbook, see add_env_arg
+            self._env = self._config.provisioner.env.layer({})
 
     def bake(self):
         """Bake an ``ansible-playbook`` command so it's ready to execute and \
@@ -111,14 +117,24 @@ def execute(self, action_args=None):
             warnings.filterwarnings("default", category=MoleculeRuntimeWarning)
             self._config.driver.sanity_checks()
             cwd = self._config.scenario_path
-            result = util.run_command(
-                cmd=self._ansible_command,
-                env=self._env,
-                debug=self._config.debug,
-                cwd=cwd,
-            )
-
-        if result.returncode != 0:
+            events_file = self._config.provisioner.events_file
+            events.clear(events_file)
+            events.abort_after(events_file, self._abort_after)
+            try:
+                result = executor.run(
+                    cmd=self._ansible_command,
+                    env=self._env,
+                    debug=self._config.debug,
+                    cwd=cwd,
+                )
+            finally:
+                events.abort_after(events_file, 0)
+            recorded = events.load(events_file)
+            if result.returncode != 0 or recorded is None or events.changed(recorded):
+                # facts gathered before changes to the instances may be stale
+                self._config.provisioner.clear_facts()
+
+        if result.returncode != 0 and not self._aborted(result.returncode):
             from rich.markup import escape
 
             util.sysexit_with_message(
@@ -129,6 +145,13 @@ def execute(self, action_args=None):
 
         return result.stdout
 
+    def _aborted(self, returncode):
+        """Return True when the run stopped after abort_after changes."""
+        if not self._abort_after or returncode != RC_ABORTED:
+            return False
+        recorded = events.load(self._config.provisioner.events_file) or []
+        return len(events.changed(recorded)) >= self._abort_after
+
     def add_cli_arg(self, name, value):
         """Add argument to CLI passed to ansible-playbook and returns None.
 
@@ -0,0 +1,468 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Run ``ansible-playbook`` from a pool of warm worker processes.
+
+Spawning ``ansible-playbook`` pays for interpreter startup, Ansible imports
+and plugin loading before the first task runs. When
+``MOLECULE_ANSIBLE_EXECUTOR`` is set to ``helper``, playbooks are instead
+handed to a zygote process which imported Ansible once and keeps workers
+forked from itself ready. Each worker runs a single job then exits, so the
+state a run leaves behind (loaded plugins, collection finder,
+``os.environ``, signal handlers) never reaches the next one.
+
+Ansible reads its configuration when imported, so a zygote only serves jobs
+sharing the environment, working directory and ``ansible.cfg`` (path and
+mtime) it was started with. The pool
+keeps up to :data:`MAX_ZYGOTES` of them, the least recently used one is
+stopped when another environment comes along.
+"""
+from __future__ import annotations
+
+import atexit
+import codecs
+import collections
+import contextlib
+import importlib.util
+import json
+import logging
+import os
+import selectors
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import threading
+from subprocess import CompletedProcess
+
+from molecule import util
+
+LOG = logging.getLogger(__name__)
+EXECUTORS = ("subprocess", "helper")
+# Environment forced by ansible_compat.runtime.Runtime.run on every command.
+FORCED_ENV = {"ANSIBLE_DEBUG": "0", "ANSIBLE_VERBOSE_TO_STDERR": "True"}
+# Length prefix of the jobs sent to zygotes and workers.
+HEADER = struct.Struct("!I")
+# Zygotes kept running, provisioner and verifier environments usually differ.
+MAX_ZYGOTES = 4
+# Idle workers each zygote keeps forked, see MOLECULE_ANSIBLE_WORKERS.
+DEFAULT_WORKERS = 1
+
+
+def executor() -> str:
+    """Return the executor selected by ``MOLECULE_ANSIBLE_EXECUTOR``."""
+    value = os.environ.get("MOLECULE_ANSIBLE_EXECUTOR", "subprocess").lower()
+    if value not in EXECUTORS:
+        util.sysexit_with_message(
+            f"Invalid MOLECULE_ANSIBLE_EXECUTOR '{value}', "
+            f"expected one of: {', '.join(EXECUTORS)}.",
+        )
+    return value
+
+
+def run(cmd: list[str], env=None, debug=False, cwd=None) -> CompletedProcess:
+    """Execute an ``ansible-playbook`` command and returns a CompletedProcess.
+
+    Output is shown while the command runs and captured, as done by
+    :func:`molecule.util.run_command` which is used unless the helper
+    executor is enabled. Jobs may be submitted from several threads.
+
+    :param cmd: A list of strings containing the command line.
+    :param env: An optional environment of the command.
+    :param debug: An optional bool to toggle debug output.
+    :param cwd: An optional string containing the working directory.
+    :return: CompletedProcess
+    """
+    if executor() != "helper" or not _supported(cmd):
+        return util.run_command(cmd=cmd, env=env, debug=debug, cwd=cwd)
+
+    if isinstance(env, util.Environment):
+        env = env.materialize()
+    env = dict(os.environ if env is None else env, **FORCED_ENV)
+    cwd = os.path.abspath(cwd or os.getcwd())
+    if debug:
+        util.print_environment_vars(env)
+
+    zygote = pool.get(env, cwd)
+    if zygote is None:
+        return util.run_command(cmd=cmd, env=env, debug=debug, cwd=cwd)
+    return zygote.run(cmd, env, cwd)
+
+
+def _supported(cmd: list[str]) -> bool:
+    return (
+        bool(cmd)
+        and os.path.basename(cmd[0]) == "ansible-playbook"
+        and importlib.util.find_spec("ansible") is not None
+    )
+
+
+class Zygote:
+    """A process importing Ansible once and forking a worker per job."""
+
+    def __init__(self, env: dict[str, str], cwd: str) -> None:
+        """Start a zygote process and returns None.
+
+        :param env: A dict containing the environment Ansible is imported with.
+        :param cwd: A string containing the working directory of the zygote.
+        :returns: None
+        """
+        self.key = _key(env, cwd)
+        self._lock = threading.Lock()
+        self._sock, remote = socket.socketpair()
+        workers = os.environ.get("MOLECULE_ANSIBLE_WORKERS", str(DEFAULT_WORKERS))
+        with remote:
+            # ruff: noqa: S603
+            self._proc = subprocess.Popen(
+                [sys.executable, "-m", __name__, str(remote.fileno()), workers],
+                env=env,
+                cwd=cwd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                pass_fds=[remote.fileno()],
+            )
+
+    def ready(self) -> bool:
+        """Wait for the zygote to import Ansible and returns a bool."""
+        reply = _read_reply(self._sock.fileno())
+        if reply.get("ready"):
+            return True
+        LOG.warning(
+            "Ansible helper failed to start, spawning ansible-playbook instead: %s",
+            reply.get("error", "no reply"),
+        )
+        self.close()
+        return False
+
+    def run(self, cmd: list[str], env: dict[str, str], cwd: str) -> CompletedProcess:
+        """Run cmd in a worker of the zygote and returns a CompletedProcess.
+
+        :param cmd: A list of strings containing the command line.
+        :param env: A dict containing the environment of the command.
+        :param cwd: A string containing the working directory.
+        :return: CompletedProcess
+        """
+        stdin = _stdin()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        status_r, status_w = os.pipe()
+        fds = [stdin, out_w, err_w, status_w]
+        try:
+            job = json.dumps({"args": cmd, "env": env, "cwd": cwd}).encode()
+            with self._lock:
+                socket.send_fds(self._sock, [HEADER.pack(len(job))], fds)
+                self._sock.sendall(job)
+        except OSError:
+            for fd in (out_r, err_r, status_r):
+                os.close(fd)
+            raise
+        finally:
+            for fd in fds if stdin != 0 else fds[1:]:
+                os.close(fd)
+        stdout, stderr = _tee({out_r: sys.stdout, err_r: sys.stderr})
+        reply = _read_reply(status_r)
+        os.close(status_r)
+        if "returncode" not in reply:
+            msg = f"Ansible helper exited while running: {' '.join(cmd)}"
+            util.sysexit_with_message(msg)
+        return CompletedProcess(cmd, reply["returncode"], stdout, stderr)
+
+    def alive(self) -> bool:
+        """Return True while the zygote process runs."""
+        return self._proc.poll() is None
+
+    def close(self) -> None:
+        """Stop the zygote process and returns None."""
+        self._sock.close()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+
+class Pool:
+    """Zygotes indexed by the environment and working directory they serve."""
+
+    def __init__(self) -> None:
+        """Initialize an empty pool and returns None."""
+        self._lock = threading.Lock()
+        self._zygotes: collections.OrderedDict[
+            tuple,
+            Zygote,
+        ] = collections.OrderedDict()
+
+    def get(self, env: dict[str, str], cwd: str) -> Zygote | None:
+        """Return a ready zygote for env and cwd, None when it fails to start.
+
+        :param env: A dict containing the environment of the jobs.
+        :param cwd: A string containing the working directory of the jobs.
+        :return: Zygote
+        """
+        key = _key(env, cwd)
+        with self._lock:
+            zygote = self._zygotes.pop(key, None)
+            if zygote is not None and not zygote.alive():
+                zygote.close()
+                zygote = None
+            if zygote is None:
+                zygote = Zygote(env, cwd)
+                if not zygote.ready():
+                    return None
+            self._zygotes[key] = zygote
+            while len(self._zygotes) > MAX_ZYGOTES:
+                LOG.debug("Stopping the least recently used Ansible helper")
+                self._zygotes.popitem(last=False)[1].close()
+            return zygote
+
+    def close(self) -> None:
+        """Stop every zygote and returns None."""
+        with self._lock:
+            while self._zygotes:
+                self._zygotes.popitem()[1].close()
+
+
+pool = Pool()
+
+
+@atexit.register
+def shutdown() -> None:
+    """Stop the zygotes of the pool and returns None."""
+    pool.close()
+
+
+def _key(env: dict[str, str], cwd: str) -> tuple:
+    config_file = _config_file(env, cwd)
+    try:
+        mtime = os.stat(config_file).st_mtime_ns if config_file else None
+    except OSError:
+        mtime = None
+    return (tuple(sorted(env.items())), cwd, config_file, mtime)
+
+
+def _config_file(env: dict[str, str], cwd: str) -> str | None:
+    """Return the ansible.cfg Ansible would read, in its search order."""
+    candidates = [
+        env.get("ANSIBLE_CONFIG"),
+        os.path.join(cwd, "ansible.cfg"),
+        os.path.join(env.get("HOME", os.path.expanduser("~")), ".ansible.cfg"),
+        "/etc/ansible/ansible.cfg",
+    ]
+    for path in candidates:
+        if not path:
+            continue
+        path = os.path.join(cwd, os.path.expanduser(path))
+        if os.path.isdir(path):
+            path = os.path.join(path, "ansible.cfg")
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _stdin() -> int:
+    try:
+        os.fstat(0)
+    except OSError:
+        return os.open(os.devnull, os.O_RDONLY)
+    return 0
+
+
+def _read_reply(fd: int) -> dict:
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            return {}
+        data += chunk
+    return json.loads(data)
+
+
+def _tee(streams: dict) -> tuple[str, str]:
+    """Copy the pipes to their stream until closed and returns their content."""
+    captured: dict[int, list[str]] = {fd: [] for fd in streams}
+    decoders = {fd: codecs.getincrementaldecoder("utf-8")("replace") for fd in streams}
+    with selectors.DefaultSelector() as selector:
+        for fd in streams:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            for key, _ in selector.select():
+                data = os.read(key.fd, 65536)
+                text = decoders[key.fd].decode(data, final=not data)
+                if not data:
+                    selector.unregister(key.fd)
+                    os.close(key.fd)
+                captured[key.fd].append(text)
+                streams[key.fd].write(text)
+                streams[key.fd].flush()
+    return tuple("".join(captured[fd]) for fd in streams)  # type: ignore[return-value]
+
+
+def _receive_job(sock: socket.socket, maxfds: int) -> tuple[bytes, list[int]]:
+    # the descriptors come along with the length of the job
+    header, fds, _, _ = socket.recv_fds(sock, HEADER.size, maxfds)
+    if not header:
+        return b"", fds
+    header += _recv_exactly(sock, HEADER.size - len(header))
+    return _recv_exactly(sock, HEADER.unpack(header)[0]), fds
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise SystemExit(0)
+        data += chunk
+    return data
+
+
+class _Server:
+    """The zygote side, handing each job to an idle worker forked earlier.
+
+    Each worker waits on a socket of its own for a single job. The exit
+    status of a worker is written to the status descriptor which came with
+    its job.
+    """
+
+    def __init__(self, sock: socket.socket, workers: int) -> None:
+        self.sock = sock
+        self.workers = max(workers, 1)
+        self.idle: collections.deque[tuple[int, socket.socket]] = collections.deque()
+        self.running: dict[int, int] = {}
+
+    def serve(self) -> None:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        try:
+            from ansible.cli.playbook import PlaybookCLI
+        except Exception as e:
+            self.sock.sendall((json.dumps({"error": repr(e)}) + "\n").encode())
+            return
+        self.cli = PlaybookCLI
+
+        wakeup_r, wakeup_w = os.pipe()
+        os.set_blocking(wakeup_w, False)
+        signal.set_wakeup_fd(wakeup_w)
+        signal.signal(signal.SIGCHLD, lambda *_: None)
+        while len(self.idle) < self.workers:
+            self.fork()
+        self.sock.sendall(b'{"ready": true}\n')
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            selector.register(wakeup_r, selectors.EVENT_READ)
+            while True:
+                for key, _ in selector.select():
+                    if key.fd == wakeup_r:
+                        os.read(wakeup_r, 4096)
+                    elif not self.dispatch():
+                        return
+                self.reap()
+
+    def dispatch(self) -> bool:
+        job, fds = _receive_job(self.sock, 4)
+        if not job:
+            return False
+        if not self.idle:
+            self.fork()
+        pid, worker = self.idle.popleft()
+        with worker:
+            socket.send_fds(worker, [HEADER.pack(len(job))], fds[:3])
+            worker.sendall(job)
+        for fd in fds[:3]:
+            os.close(fd)
+        self.running[pid] = fds[3]
+        # keep the next worker warm while this one runs
+        while len(self.idle) < self.workers:
+            self.fork()
+        return True
+
+    def fork(self) -> None:
+        parent, child = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent.close()
+            self.sock.close()
+            for _, other in self.idle:
+                other.close()
+            for fd in self.running.values():
+                os.close(fd)
+            _worker(self.cli, child)
+        child.close()
+        self.idle.append((pid, parent))
+
+    def reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.running:
+                fd = self.running.pop(pid)
+                reply = {"returncode": os.waitstatus_to_exitcode(status)}
+                with contextlib.suppress(OSError):
+                    os.write(fd, (json.dumps(reply) + "\n").encode())
+                os.close(fd)
+            for item in [item for item in self.idle if item[0] == pid]:
+                self.idle.remove(item)
+                item[1].close()
+
+
+def _worker(cli, sock: socket.socket) -> None:
+    """Wait for a single job on sock, run it and exit."""
+    code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        job, fds = _receive_job(sock, 3)
+        sock.close()
+        if not job:
+            code = 0
+            return
+        job = json.loads(job)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.environ.clear()
+        os.environ.update(job["env"])
+        os.chdir(job["cwd"])
+        sys.argv = job["args"]
+        try:
+            cli.cli_executor(job["args"])
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+        else:
+            code = 0
+    finally:
+        with contextlib.suppress(Exception):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(code)
+
+
+if __name__ == "__main__":
+    # the working directory is the scenario, it must not shadow any module
+    sys.path.pop(0)
+    _Server(socket.socket(fileno=int(sys.argv[1])), int(sys.argv[2])).serve()
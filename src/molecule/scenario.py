@@ -20,19 +20,26 @@
 """Molecule Scenario Module."""
 from __future__ import annotations
 
+import contextlib
 import errno
-import fcntl
+import filecmp
 import fnmatch
 import logging
 import os
+import re
 import shutil
 from pathlib import Path
-from time import sleep
 
-from molecule import scenarios, util
-from molecule.constants import RC_TIMEOUT
+from molecule import locking, scenarios, util
 
 LOG = logging.getLogger(__name__)
+# Files copied back to disk when the ephemeral directory is kept in memory,
+# relative to the scenario ephemeral directory. Everything else found there
+# is scratch data lost on reboot.
+PERSISTED_FILES = ("state.yml", "instance_config.yml")
+# Memory backed directory shared between users, only a private subdirectory
+# owned by the current user is used there.
+SHM_DIRECTORY = "/dev/shm"  # noqa: S108
 
 
 class Scenario:
@@ -44,7 +51,6 @@ def __init__(self, config) -> None:
         :param config: An instance of a Molecule config.
         :return: None
         """
-        self._lock = None
         self.config = config
         self._setup()  # type: ignore
 
@@ -53,16 +59,20 @@ def _remove_scenario_state_directory(self):
 
         :return: None
         """
-        directory = str(Path(self.ephemeral_directory).parent)
-        LOG.info("Removing %s", directory)
-        shutil.rmtree(directory)
+        paths = (self.ephemeral_directory, self.persistent_directory)
+        locking.manager.release(os.path.join(paths[0], ".lock"))
+        for path in paths:
+            if path:
+                directory = str(Path(path).parent)
+                LOG.info("Removing %s", directory)
+                shutil.rmtree(directory)
 
     def prune(self):
         """Prune the scenario ephemeral directory files and returns None.
 
         "safe files" will not be pruned, including the ansible configuration
-        and inventory used by this scenario, the scenario state file, and
-        files declared as "safe_files" in the ``driver`` configuration
+        and inventory used by this scenario, the scenario state file, the
+        lock file held on the ephemeral directory, and files declared as "safe_files" in the ``driver`` configuration
         declared in ``molecule.yml``.
 
         :return: None
@@ -72,21 +82,16 @@ def prune(self):
             self.config.provisioner.config_file,
             self.config.provisioner.inventory_file,
             self.config.state.state_file,
+            self.config.state.journal_file,
+            os.path.join(self.ephemeral_directory, ".lock"),
             *self.config.driver.safe_files,
         ]
-        files = util.os_walk(self.ephemeral_directory, "*")
-        for f in files:
-            if not any(sf for sf in safe_files if fnmatch.fnmatch(f, sf)):
-                try:
-                    os.remove(f)
-                except OSError as e:
-                    if e.errno != errno.ENOENT:
-                        raise
-
-        # Remove empty directories.
-        for dirpath, dirs, files in os.walk(self.ephemeral_directory, topdown=False):
-            if not dirs and not files:
-                os.removedirs(dirpath)
+        # a single regex tested once per file instead of one fnmatch per glob
+        safe = re.compile(
+            "|".join(fnmatch.translate(sf) for sf in safe_files) or "(?!)",
+        )
+        if _prune_directory(self.ephemeral_directory, safe.match):
+            os.removedirs(self.ephemeral_directory)
 
     @property
     def name(self):
@@ -102,39 +107,74 @@ def directory(self):
     def ephemeral_directory(self):
         path = os.getenv("MOLECULE_EPHEMERAL_DIRECTORY", None)
         if not path:
-            project_directory = os.path.basename(self.config.project_directory)
-
-            if self.config.is_parallel:
-                project_directory = f"{project_directory}-{self.config._run_uuid}"
-
-            project_scenario_directory = os.path.join(
-                self.config.cache_directory,
-                project_directory,
-                self.name,
-            )
-
-            path = ephemeral_directory(project_scenario_directory)
-
-        if os.environ.get("MOLECULE_PARALLEL", False) and not self._lock:
-            with open(os.path.join(path, ".lock"), "w") as self._lock:
-                for i in range(1, 5):
-                    try:
-                        fcntl.lockf(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                        break
-                    except OSError:
-                        delay = 30 * i
-                        LOG.warning(
-                            "Retrying to acquire lock on %s, waiting for %s seconds",
-                            path,
-                            delay,
-                        )
-                        sleep(delay)
-                else:
-                    LOG.warning("Timedout trying to acquire lock on %s", path)
-                    raise SystemExit(RC_TIMEOUT)
+            path = memory_directory(
+                self._project_scenario_directory,
+            ) or ephemeral_directory(self._project_scenario_directory)
+
+        if os.environ.get("MOLECULE_PARALLEL", False):
+            locking.manager.acquire(os.path.join(path, ".lock"))
 
         return path
 
+    @property
+    def persistent_directory(self):
+        """Return the on disk directory backing a memory ephemeral directory.
+
+        :return: str or None when the ephemeral directory is not in memory.
+        """
+        if os.getenv("MOLECULE_EPHEMERAL_DIRECTORY") or not memory_directory():
+            return None
+        return ephemeral_directory(self._project_scenario_directory)
+
+    @property
+    def _project_scenario_directory(self):
+        project_directory = os.path.basename(self.config.project_directory)
+
+        if self.config.is_parallel:
+            project_directory = f"{project_directory}-{self.config._run_uuid}"
+
+        return os.path.join(self.config.cache_directory, project_directory, self.name)
+
+    def persist(self):
+        """Copy :data:`PERSISTED_FILES` to the persistent directory.
+
+        Files that no longer exist in memory are removed from disk as well, so
+        a restore never brings back instances destroyed since.
+
+        :return: None
+        """
+        target = self.persistent_directory
+        if not target:
+            return
+        for name in PERSISTED_FILES:
+            source = os.path.join(self.ephemeral_directory, name)
+            destination = os.path.join(target, name)
+            if not os.path.isfile(source):
+                if os.path.lexists(destination):
+                    os.unlink(destination)
+            elif not os.path.isfile(destination) or not filecmp.cmp(
+                source,
+                destination,
+                shallow=False,
+            ):
+                LOG.debug("Persisting %s to %s", source, destination)
+                tmp = f"{destination}.{os.getpid()}"
+                shutil.copy2(source, tmp)
+                os.replace(tmp, destination)
+
+    def _restore(self):
+        """Restore persisted files missing from the memory directory."""
+        source = self.persistent_directory
+        if not source:
+            return
+        for name in PERSISTED_FILES:
+            destination = os.path.join(self.ephemeral_directory, name)
+            if os.path.isfile(os.path.join(source, name)) and not os.path.exists(
+                destination,
+            ):
+                LOG.debug("Restoring %s from %s", destination, source)
+                shutil.copy2(os.path.join(source, name), destination)
+
     @property
     def inventory_directory(self):
         return os.path.join(self.ephemeral_directory, "inventory")
@@ -209,6 +249,81 @@ def _setup(self):
         """
         if not os.path.isdir(self.inventory_directory):
             os.makedirs(self.inventory_directory, exist_ok=True)
+        self._restore()
+        if not os.getenv("MOLECULE_EPHEMERAL_DIRECTORY"):
+            # the project directory mtime drives the cache eviction order
+            directory = self.persistent_directory or self.ephemeral_directory
+            with contextlib.suppress(OSError):
+                os.utime(os.path.dirname(directory))
+
+
+def _prune_directory(path: str, is_safe) -> bool:
+    """Remove files not accepted by is_safe below path, in a single pass.
+
+    Directories emptied on the way are removed as the walk unwinds, symlinks
+    to directories are kept and not followed.
+
+    :param path: A string containing the directory to prune.
+    :param is_safe: A callable returning True for file paths to keep.
+    :return: bool telling if path was left empty.
+    """
+    empty = True
+    with os.scandir(path) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if _prune_directory(entry.path, is_safe):
+                os.rmdir(entry.path)
+            else:
+                empty = False
+        elif entry.is_dir() or is_safe(entry.path):
+            empty = False
+        else:
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+    return empty
+
+
+def memory_directory(path: str | None = None) -> str | None:
+    """Return a memory backed directory to use instead of the cache, if enabled.
+
+    ``MOLECULE_EPHEMERAL_MEMORY`` either holds a boolean, picking
+    ``$XDG_RUNTIME_DIR`` or ``/dev/shm``, or the path of a tmpfs mount.
+
+    :param path: An optional string containing a path relative to the memory
+     directory root.
+    :return: str or None when disabled or no memory directory is usable.
+    """
+    value = os.getenv("MOLECULE_EPHEMERAL_MEMORY", "")
+    if os.path.isabs(value):
+        root = value
+    elif not util.boolean(value, strict=False):
+        return None
+    elif _usable(os.getenv("XDG_RUNTIME_DIR")):
+        root = os.environ["XDG_RUNTIME_DIR"]
+    elif _usable(SHM_DIRECTORY):
+        # shared between users, unlike XDG_RUNTIME_DIR
+        root = util.private_directory(
+            os.path.join(SHM_DIRECTORY, f"molecule-{os.getuid()}"),
+        )
+    else:
+        root = None
+    if not root:
+        LOG.debug("No memory backed directory available, using the cache")
+        return None
+
+    d = os.path.abspath(os.path.join(root, path if path else "molecule"))
+    if not os.path.isdir(d):
+        os.umask(0o077)
+        Path(d).mkdir(mode=0o700, parents=True, exist_ok=True)
+    return d
+
+
+def _usable(path: str | None) -> bool:
+    return path is not None and os.path.isdir(path) and os.access(path, os.W_OK)
 
 
 def ephemeral_directory(path: str | None = None) -> str:
@@ -139,6 +139,7 @@ def main(ctx, debug, verbose, base_config, env_file):  # pragma: no cover
         atexit.register(do_report)
 
 
+main.add_command(command.cache.cache)
 main.add_command(command.cleanup.cleanup)
 main.add_command(command.check.check)
 main.add_command(command.converge.converge)
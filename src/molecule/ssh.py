@@ -0,0 +1,144 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""SSH master connections shared by the actions of a scenario.
+
+When ``MOLECULE_SSH_REUSE`` is enabled, Ansible, ``molecule login`` and
+testinfra open their SSH connections through master connections whose
+sockets live in a directory owned by the scenario. The masters outlive a
+single playbook, so ``verify`` reuses the connections opened by
+``converge``, and they are closed by ``destroy``.
+
+The directory is created by :func:`prepare` and only used while it is
+private to the current user, it may live in the shared temporary directory.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from molecule import util
+
+LOG = logging.getLogger(__name__)
+# Idle time after which a master connection exits on its own, a safety net
+# for scenarios which are never destroyed.
+CONTROL_PERSIST = "30m"
+# Longest control directory leaving room for the socket name in the 104
+# bytes of a unix socket path on macOS, ssh names them after a 40 chars hash.
+MAX_DIRECTORY_LENGTH = 60
+
+
+def enabled() -> bool:
+    """Return True when ``MOLECULE_SSH_REUSE`` enables the reuse mode.
+
+    :return: bool
+    """
+    return util.boolean(os.environ.get("MOLECULE_SSH_REUSE", "false"), strict=False)
+
+
+def control_directory(ephemeral_directory: str) -> str:
+    """Return the directory of the master sockets of a scenario.
+
+    The ephemeral directory is used unless its path is too long for a
+    socket, a directory named after its digest in the temporary directory
+    is used instead.
+
+    :param ephemeral_directory: A string containing the path of the
+     ephemeral directory of the scenario.
+    :return: str
+    """
+    directory = os.path.join(ephemeral_directory, "ssh")
+    if len(directory) > MAX_DIRECTORY_LENGTH:
+        digest = hashlib.sha256(ephemeral_directory.encode()).hexdigest()[:12]
+        directory = os.path.join(tempfile.gettempdir(), f"molecule-ssh-{digest}")
+    return directory
+
+
+def prepare(ephemeral_directory: str) -> str | None:
+    """Create the directory of the master sockets of a scenario.
+
+    :param ephemeral_directory: A string containing the path of the
+     ephemeral directory of the scenario.
+    :return: str or None when the directory is not private to the current
+     user, connections are not shared then.
+    """
+    return util.private_directory(control_directory(ephemeral_directory))
+
+
+def usable(ephemeral_directory: str) -> bool:
+    """Return True when the master sockets of a scenario can be shared.
+
+    :param ephemeral_directory: A string containing the path of the
+     ephemeral directory of the scenario.
+    :return: bool
+    """
+    return enabled() and util.is_private_directory(
+        control_directory(ephemeral_directory),
+    )
+
+
+def connection_options(ephemeral_directory: str) -> list[str]:
+    """Return the ssh options sharing the master connections of a scenario.
+
+    :param ephemeral_directory: A string containing the path of the
+     ephemeral directory of the scenario.
+    :return: list, empty unless :func:`usable`.
+    """
+    if not usable(ephemeral_directory):
+        return []
+    return [
+        "-o ControlMaster=auto",
+        f"-o ControlPersist={CONTROL_PERSIST}",
+        f"-o ControlPath={control_directory(ephemeral_directory)}/%C",
+    ]
+
+
+def close_masters(ephemeral_directory: str) -> int:
+    """Close the master connections of a scenario and returns their number.
+
+    :param ephemeral_directory: A string containing the path of the
+     ephemeral directory of the scenario.
+    :return: int
+    """
+    directory = control_directory(ephemeral_directory)
+    # never act on a directory another user may have created
+    if not util.is_private_directory(directory):
+        return 0
+    closed = 0
+    executable = shutil.which("ssh")
+    if executable:
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            # ruff: noqa: S603
+            result = subprocess.run(
+                [executable, "-o", f"ControlPath={path}", "-O", "exit", "molecule"],
+                check=False,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            closed += result.returncode == 0
+    if closed:
+        LOG.debug("Closed %d SSH master connections in %s", closed, directory)
+    shutil.rmtree(directory, ignore_errors=True)
+    return closed
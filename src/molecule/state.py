@@ -19,6 +19,9 @@
 #  DEALINGS IN THE SOFTWARE.
 """State Module."""
 
+import contextlib
+import fcntl
+import json
 import logging
 import os
 
@@ -34,6 +37,8 @@
     "is_parallel",
     "molecule_yml_date_modified",
 ]
+# Number of journaled transactions after which the state file is rewritten.
+COMPACT_THRESHOLD = 32
 
 
 class InvalidState(Exception):
@@ -46,7 +51,15 @@ class State:
     Intended to be used as a singleton throughout a given Molecule config.
     The initial state is serialized to disk if the file does not exist,
     otherwise is deserialized from the existing state file.  Changes made to
-    the object are immediately serialized.
+    the object are immediately persisted.
+
+    Changes are appended to a journal next to the state file, one line per
+    transaction, instead of rewriting the whole file.  The journal is
+    compacted back into the state file when it grows past
+    :data:`COMPACT_THRESHOLD` transactions, when the state is loaded, before
+    each action and after each scenario sequence, so ``state.yml`` is current
+    whenever a playbook reads it and ``state.yml`` written by older versions
+    is simply picked up as the initial snapshot.
 
     State is not a top level option in Molecule's config.  It's purpose is for
     bookkeeping, and each :class:`.Config` object has a reference to a State_
@@ -66,13 +79,17 @@ def __init__(self, config) -> None:
         """
         self._config = config
         self._state_file = self._get_state_file()  # type: ignore
+        self._journal_file = self._get_journal_file()  # type: ignore
+        self._batch = None
+        self._journal_entries = 0
         self._data = self._get_data()  # type: ignore
-        self._write_state_file()  # type: ignore
+        if self._journal_entries or not os.path.isfile(self.state_file):
+            self.compact()
 
     def marshal(func):
         def wrapper(self, *args, **kwargs):
-            func(self, *args, **kwargs)
-            self._write_state_file()
+            with self.batch():
+                func(self, *args, **kwargs)
 
         return wrapper
 
@@ -80,6 +97,10 @@ def wrapper(self, *args, **kwargs):
     def state_file(self):
         return self._state_file
 
+    @property
+    def journal_file(self):
+        return self._journal_file
+
     @property
     def converged(self):
         return self._data.get("converged")
@@ -108,17 +129,40 @@ def is_parallel(self):
     def molecule_yml_date_modified(self):
         return self._data.get("molecule_yml_date_modified")
 
+    @contextlib.contextmanager
+    def batch(self):
+        """Group the state changes made within the block in one transaction.
+
+        The changes are journaled with a single append when the block exits,
+        and discarded if it raises.  Nested blocks join the outer one.
+        """
+        if self._batch is not None:
+            yield
+            return
+
+        self._batch = {}
+        data = dict(self._data)
+        try:
+            yield
+        except BaseException:
+            self._data = data
+            raise
+        finally:
+            entry, self._batch = self._batch, None
+        if entry:
+            self._append(entry)
+
     @marshal  # type: ignore
     def reset(self):
         self._data = self._default_data()
+        self._batch.clear()  # type: ignore
+        self._batch["data"] = dict(self._data)  # type: ignore
 
     @marshal  # type: ignore
     def change_state(self, key, value):
         """Change the state of the instance data with the given \
         ``key`` and the provided ``value``.
 
-        Wrapping with a decorator is probably not necessary.
-
         :param key: A ``str`` containing the key to update
         :param value: A value to change the ``key`` to
         :return: None
@@ -126,11 +170,68 @@ def change_state(self, key, value):
         if key not in VALID_KEYS:
             raise InvalidState
         self._data[key] = value
+        self._batch.setdefault("set", {})[key] = value  # type: ignore
+
+    def compact(self):
+        """Fold the journal into the state file and returns None.
+
+        :return: None
+        """
+        with self._journal(fcntl.LOCK_EX) as fd:
+            # pick up transactions appended by other processes meanwhile
+            self._data = self._read(fd)
+            if not os.fstat(fd).st_size and os.path.isfile(self.state_file):
+                # nothing to fold, spare the rewrite done before every action
+                return
+            tmp = f"{self.state_file}.{os.getpid()}"
+            util.write_file(tmp, util.safe_dump(self._data))
+            os.replace(tmp, self.state_file)
+            os.ftruncate(fd, 0)
+        self._journal_entries = 0
+
+    def _append(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), default=str) + "\n"
+        with self._journal(fcntl.LOCK_EX) as fd:
+            _truncate_torn_line(fd)
+            os.write(fd, line.encode())
+        self._journal_entries += 1
+        if self._journal_entries >= COMPACT_THRESHOLD:
+            self.compact()
+
+    @contextlib.contextmanager
+    def _journal(self, operation):
+        fd = os.open(self._journal_file, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+            yield fd
+        finally:
+            os.close(fd)
 
     def _get_data(self):
-        if os.path.isfile(self.state_file):
+        if not os.path.isfile(self._journal_file):
             return self._load_file()
-        return self._default_data()
+        with self._journal(fcntl.LOCK_SH) as fd:
+            return self._read(fd)
+
+    def _read(self, fd):
+        data = self._load_file()
+        self._journal_entries = 0
+        with os.fdopen(os.dup(fd), "rb") as f:
+            f.seek(0)
+            for line in f:
+                # a torn write from an interrupted process is not a transaction
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    LOG.warning("Ignoring corrupted entry in %s", self._journal_file)
+                    continue
+                if "data" in entry:
+                    data = entry["data"]
+                data.update(entry.get("set", {}))
+                self._journal_entries += 1
+        return data
 
     def _default_data(self):
         return {
@@ -144,10 +245,26 @@ def _default_data(self):
         }
 
     def _load_file(self):
-        return util.safe_load_file(self.state_file)
-
-    def _write_state_file(self):
-        util.write_file(self.state_file, util.safe_dump(self._data))
+        if os.path.isfile(self.state_file):
+            return util.safe_load_file(self.state_file) or self._default_data()
+        return self._default_data()
 
     def _get_state_file(self):
         return os.path.join(self._config.scenario.ephemeral_directory, "state.yml")
+
+    def _get_journal_file(self):
+        return os.path.join(
+            self._config.scenario.ephemeral_directory,
+            "state.journal",
+        )
+
+
+def _truncate_torn_line(fd):
+    """Drop a partial line left at the end of the journal by a torn write.
+
+    Appending after it would otherwise glue the next transaction to it.
+    """
+    size = os.fstat(fd).st_size
+    if not size or os.pread(fd, 1, size - 1) == b"\n":
+        return
+    os.ftruncate(fd, os.pread(fd, size, 0).rfind(b"\n") + 1)
@@ -20,11 +20,13 @@
 
 from __future__ import annotations
 
+import collections
 import copy
 import fnmatch
 import logging
 import os
 import re
+import stat
 import sys
 from subprocess import CalledProcessError, CompletedProcess
 from typing import TYPE_CHECKING, Any, NoReturn
@@ -44,6 +46,15 @@
 
 LOG = logging.getLogger(__name__)
 
+# Use libyaml bindings when PyYAML was built with them, falling back to the
+# pure Python implementation otherwise.
+try:
+    from yaml import CSafeDumper as _CSafeDumper
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover
+    _CSafeDumper = None  # type: ignore
+    from yaml import SafeLoader as _SafeLoader  # type: ignore
+
 
 class SafeDumper(yaml.SafeDumper):
     """SafeDumper YAML Class."""
@@ -52,6 +63,56 @@ def increase_indent(self, flow=False, indentless=False):
         return super().increase_indent(flow, False)
 
 
+def _has_nested_sequence(data: Any) -> bool:
+    """Return True if data holds a non-empty sequence inside a mapping.
+
+    These are the only nodes where the output of libyaml differs from
+    :class:`SafeDumper`, as libyaml always emits them indentless.
+    """
+    if isinstance(data, dict):
+        for v in data.values():
+            if isinstance(v, list | tuple) and v:
+                return True
+            if _has_nested_sequence(v):
+                return True
+    elif isinstance(data, list | tuple):
+        return any(_has_nested_sequence(v) for v in data)
+    return False
+
+
+class Environment(collections.ChainMap):
+    """Layered environment passed to the commands Molecule spawns.
+
+    The base layer is usually the process environment (``os.environ``) which is
+    never copied. Each :meth:`layer` call returns a new environment with a copy
+    of the given mapping on top, so writes never reach the layers underneath.
+    Use :meth:`materialize` to obtain a flat dict when spawning a process.
+    """
+
+    def layer(self, *mappings: MutableMapping) -> Environment:
+        """Return a new environment with the given mappings stacked on top."""
+        env = self
+        for mapping in mappings:
+            env = env.new_child(dict(mapping))
+        return env
+
+    def materialize(self) -> dict[str, str]:
+        """Flatten all layers into a new dict."""
+        return dict(self)
+
+
+def layered_env(base: MutableMapping, *mappings: MutableMapping) -> Environment:
+    """Return an environment stacking mappings on top of base.
+
+    :param base: The environment to start from, usually ``os.environ``.
+    :param mappings: Mappings overriding base, from lowest to highest priority.
+    :return: Environment
+    """
+    if not isinstance(base, Environment):
+        base = Environment(base)
+    return base.layer(*mappings)
+
+
 def print_debug(title: str, data: str) -> None:
     """Print debug information."""
     console.print(f"DEBUG: {title}:\n{data}")
@@ -132,6 +193,8 @@ def run_command(
     :param debug: An optional bool to toggle debug output.
     """
     args = cmd
+    if isinstance(env, Environment):
+        env = env.materialize()
 
     if debug:
         print_environment_vars(env)
@@ -176,19 +239,36 @@ def render_template(template, **kwargs):
     return t.render(kwargs)
 
 
-def write_file(filename: str, content: str, header: str | None = None) -> None:
-    """Write a file with the given filename and content and returns None.
+def write_file(filename: str, content: str, header: str | None = None) -> bool:
+    """Write a file with the given filename and content.
+
+    The file is left untouched when it already holds the same content, which
+    keeps its mtime stable for anything caching on it.
 
     :param filename: A string containing the target filename.
     :param content: A string containing the data to be written.
     :param header: A header, if None it will use default header.
-    :return: None
+    :return: bool telling if the file was written.
     """
     if header is None:
         content = MOLECULE_HEADER + "\n\n" + content
 
+    if _has_content(filename, content):
+        return False
     with open(filename, "w") as f:
         f.write(content)
+    return True
+
+
+def _has_content(filename: str, content: str) -> bool:
+    try:
+        # cheap size check before reading the file back
+        if os.path.getsize(filename) != len(content.encode()):
+            return False
+        with open(filename) as f:
+            return f.read() == content
+    except (OSError, UnicodeDecodeError):
+        return False
 
 
 def molecule_prepender(content: str) -> str:
@@ -212,12 +292,22 @@ def file_prepender(filename: str) -> None:
 def safe_dump(data: Any, explicit_start=True) -> str:
     """Dump the provided data to a YAML document and returns a string.
 
+    libyaml is used when it is available and produces the same output as
+    :class:`SafeDumper`, otherwise the pure Python emitter is used.
+
     :param data: A string containing an absolute path to the file to parse.
     :return: str
     """
+    dumper = SafeDumper
+    if (
+        _CSafeDumper is not None
+        and isinstance(data, dict | list)
+        and not _has_nested_sequence(data)
+    ):
+        dumper = _CSafeDumper
     return yaml.dump(
         data,
-        Dumper=SafeDumper,
+        Dumper=dumper,
         default_flow_style=False,
         explicit_start=explicit_start,
     )
@@ -230,7 +320,7 @@ def safe_load(string) -> dict:
     :return: dict
     """
     try:
-        return yaml.safe_load(string) or {}
+        return yaml.load(string, Loader=_SafeLoader) or {}
     except yaml.scanner.ScannerError as e:
         sysexit_with_message(str(e))
     return {}
@@ -279,6 +369,49 @@ def abs_path(path: str) -> str | None:
     return None
 
 
+def is_private_directory(path: str) -> bool:
+    """Return True when path is a directory only the current user can access.
+
+    Symlinks are not followed, another user could otherwise point path to a
+    directory of their own.
+
+    :param path: A string containing the path of the directory.
+    :return: bool
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and stat.S_IMODE(st.st_mode) == 0o700
+    )
+
+
+def private_directory(path: str) -> str | None:
+    """Create a directory for the current user only and returns its path.
+
+    An existing path is only used when :func:`is_private_directory` accepts
+    it, as in a directory shared between users, like ``/dev/shm`` or
+    ``/tmp``, another user could have created it beforehand.
+
+    :param path: A string containing the path of the directory.
+    :return: str or None when path is not private to the current user.
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError as e:
+        LOG.debug("Unable to create %s: %s", path, e)
+        return None
+    if not is_private_directory(path):
+        LOG.warning("Not using %s, it is not private to the current user", path)
+        return None
+    return path
+
+
 def merge_dicts(a: MutableMapping, b: MutableMapping) -> MutableMapping:
     """Merge the values of b into a and returns a new dict.
 
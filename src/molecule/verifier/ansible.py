@@ -20,9 +20,7 @@
 """Ansible Verifier Module."""
 
 import logging
-import os
 
-from molecule import util
 from molecule.api import Verifier
 
 log = logging.getLogger(__name__)
@@ -68,8 +66,9 @@ def default_options(self):
 
     @property
     def default_env(self):
-        env = util.merge_dicts(os.environ, self._config.env)
-        return util.merge_dicts(env, self._config.provisioner.env)
+        # the provisioner env already layers the scenario env on top of the
+        # process environment, a child keeps writes out of its cache
+        return self._config.provisioner.env.new_child()
 
     def execute(self, action_args=None):
         if not self.enabled:
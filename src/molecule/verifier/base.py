@@ -96,7 +96,7 @@ def options(self):
 
     @property
     def env(self):
-        return util.merge_dicts(
+        return util.layered_env(
             self.default_env,
             self._config.config["verifier"]["env"],
         )
@@ -127,10 +127,9 @@ def options(self):
 
     @property
     def default_env(self):
-        env = util.merge_dicts(os.environ, self._config.env)
-        env = util.merge_dicts(env, self._config.provisioner.env)
-
-        return env
+        # the provisioner env already layers the scenario env on top of the
+        # process environment, a child keeps writes out of its cache
+        return self._config.provisioner.env.new_child()
 
     @property
     def additional_files_or_dirs(self):
@@ -215,6 +215,15 @@ def test_execute_subcommand(config_instance: config.Config):
     assert config_instance.action == "list"
 
 
+def test_execute_subcommand_compacts_state(config_instance: config.Config):
+    config_instance.state.change_state("created", True)
+
+    base.execute_subcommand(config_instance, "list")
+
+    assert util.safe_load_file(config_instance.state.state_file)["created"]
+    assert not os.path.getsize(config_instance.state.journal_file)
+
+
 def test_execute_scenario(mocker: MockerFixture, _patched_execute_subcommand):
     # call a spoofed scenario with a sequence that does not include destroy:
     # - execute_subcommand should be called once for each sequence item
@@ -241,6 +250,67 @@ def test_execute_scenario_destroy(mocker: MockerFixture, _patched_execute_subcom
     assert scenario.prune.called
 
 
+def test_execute_scenario_persists_on_failure(
+    mocker: MockerFixture,
+    _patched_execute_subcommand,
+):
+    scenario = mocker.Mock()
+    scenario.sequence = ("create", "converge")
+    _patched_execute_subcommand.side_effect = [None, SystemExit(1)]
+
+    with pytest.raises(SystemExit):
+        base.execute_scenario(scenario)
+
+    assert scenario.config.state.compact.called
+    assert scenario.persist.called
+
+
+@pytest.fixture()
+def _memory_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOLECULE_EPHEMERAL_MEMORY", str(tmp_path))
+
+
+def test_execute_scenario_persists_created_state_on_failure(
+    mocker: MockerFixture,
+    _memory_directory,
+    config_instance: config.Config,
+):
+    scenario = config_instance.scenario
+    assert {"create", "converge"} <= set(scenario.sequence)
+
+    def execute_subcommand(config, action):
+        if action == "converge":
+            raise SystemExit(1)
+        config.state.change_state("created", True)
+
+    mocker.patch(
+        "molecule.command.base.execute_subcommand",
+        side_effect=execute_subcommand,
+    )
+
+    with pytest.raises(SystemExit):
+        base.execute_scenario(scenario)
+
+    state_file = os.path.join(scenario.persistent_directory, "state.yml")
+    assert util.safe_load_file(state_file)["created"]
+
+
+def test_execute_cmdline_scenarios_reset_removes_persistent_directory(
+    config_instance: config.Config,
+    monkeypatch,
+    tmp_path,
+):
+    monkeypatch.setenv("MOLECULE_EPHEMERAL_MEMORY", str(tmp_path))
+    command_args = {"subcommand": "reset"}
+    scenario = config_instance.scenario
+    paths = (scenario.ephemeral_directory, scenario.persistent_directory)
+    assert all(os.path.isdir(path) for path in paths)
+
+    base.execute_cmdline_scenarios("default", {}, command_args)
+
+    assert not any(os.path.exists(path) for path in paths)
+
+
 def test_get_configs(config_instance: config.Config):
     molecule_file = config_instance.molecule_file
     data = config_instance.config
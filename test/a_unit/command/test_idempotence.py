@@ -18,6 +18,7 @@
 #  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 
+import json
 from unittest.mock import Mock
 
 import pytest
@@ -94,6 +95,70 @@ def test_execute_raises_when_fails_idempotence(
     assert msg in caplog.text
 
 
+def _write_events(path, *changed):
+    with open(path, "w") as f:
+        for i, value in enumerate(changed):
+            event = {
+                "play": "all",
+                "task": f"task {i}",
+                "host": "instance",
+                "status": "changed" if value else "ok",
+                "changed": value,
+                "duration": 0.1,
+            }
+            f.write(json.dumps(event) + "\n")
+
+
+def test_execute_uses_events(
+    caplog: pytest.LogCaptureFixture,
+    patched_ansible_converge,
+    _patched_is_idempotent: Mock,
+    _instance,
+):
+    _write_events(_instance._config.provisioner.events_file, False, False)
+
+    _instance.execute()
+
+    assert not _patched_is_idempotent.called
+    assert "Idempotence completed successfully." in caplog.text
+
+
+def test_execute_reports_changed_events(
+    caplog: pytest.LogCaptureFixture,
+    patched_ansible_converge,
+    _instance,
+):
+    _write_events(_instance._config.provisioner.events_file, False, True, True)
+
+    with pytest.raises(SystemExit):
+        _instance.execute()
+
+    assert "* [instance] => task 1\n* [instance] => task 2" in caplog.text
+
+
+def test_execute_aborts_after_changed_tasks(
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    patched_ansible_converge,
+    _instance,
+):
+    monkeypatch.setenv("MOLECULE_IDEMPOTENCE_ABORT_AFTER", "2")
+    _write_events(_instance._config.provisioner.events_file, False, True, True)
+
+    with pytest.raises(SystemExit):
+        _instance.execute()
+
+    patched_ansible_converge.assert_called_once_with(abort_after=2)
+    assert "Converge was stopped after 2 changed tasks." in caplog.text
+
+
+def test_abort_after_rejects_invalid_value(monkeypatch, _instance):
+    monkeypatch.setenv("MOLECULE_IDEMPOTENCE_ABORT_AFTER", "many")
+
+    with pytest.raises(SystemExit):
+        _instance._abort_after()
+
+
 def test_is_idempotent(_instance):
     output = """
 PLAY RECAP ***********************************************************
@@ -24,7 +24,7 @@
 import pytest
 from pytest_mock import MockerFixture
 
-from molecule import config
+from molecule import config, ssh
 from molecule.driver import delegated
 
 
@@ -160,6 +160,22 @@ def test_default_ssh_connection_options_property_when_managed(_instance):
     assert x == _instance.default_ssh_connection_options
 
 
+@pytest.mark.parametrize(
+    "config_instance",
+    ["_driver_managed_section_data"],
+    indirect=True,
+)
+def test_default_ssh_connection_options_reuse_masters(_instance, monkeypatch):
+    monkeypatch.setenv("MOLECULE_SSH_REUSE", "true")
+    directory = ssh.prepare(_instance._config.scenario.ephemeral_directory)
+
+    options = _instance.default_ssh_connection_options
+
+    assert "-o ControlPersist=60s" not in options
+    assert f"-o ControlPersist={ssh.CONTROL_PERSIST}" in options
+    assert f"-o ControlPath={directory}/%C" in options
+
+
 @pytest.mark.parametrize(
     "config_instance",
     ["_driver_unmanaged_section_data"],
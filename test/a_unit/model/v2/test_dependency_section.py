@@ -51,7 +51,10 @@ def _model_dependency_errors_section_data():
     indirect=True,
 )
 def test_dependency_has_errors(_config):
-    x = ["0 is not one of ['galaxy', 'shell']"]
+    x = [
+        "0 is not one of ['galaxy', 'shell']",
+        "0 is not of type 'string'",
+    ]
 
     assert x == schema_v3.validate(_config)
 
@@ -44,3 +44,11 @@ def test_molecule_schema():
         "test/resources/schema_instance_files/invalid/molecule_delegated.yml",
     ]
     assert run_command(cmd).returncode != 0
+
+
+def test_validator_is_cached():
+    schema_file = "src/molecule/data/molecule.json"
+
+    assert schema_v3._get_validator(schema_file) is schema_v3._get_validator(
+        schema_file,
+    )
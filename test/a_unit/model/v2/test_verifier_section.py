@@ -57,7 +57,10 @@ def _model_verifier_errors_section_data():
     indirect=True,
 )
 def test_verifier_has_errors(_config):
-    x = ["0 is not one of ['ansible', 'goss', 'inspec', 'testinfra']"]
+    x = [
+        "0 is not one of ['ansible', 'goss', 'inspec', 'testinfra']",
+        "0 is not of type 'string'",
+    ]
 
     assert x == schema_v3.validate(_config)
 
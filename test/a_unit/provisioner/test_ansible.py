@@ -19,14 +19,17 @@
 #  DEALINGS IN THE SOFTWARE.
 
 import collections
+import importlib.util
+import json
 import os
 import re
+import subprocess
 from test.a_unit.conftest import os_split
 
 import pytest
 from pytest_mock import MockerFixture
 
-from molecule import config, util
+from molecule import config, ssh, util
 from molecule.provisioner import ansible, ansible_playbooks
 
 
@@ -101,7 +104,7 @@ def test_default_config_options_property(_instance):
         "defaults": {
             "ansible_managed": "Ansible managed: Do NOT edit this file manually!",
             "display_failed_stderr": True,
-            "forks": 50,
+            "forks": 2,
             "host_key_checking": False,
             # https://docs.ansible.com/ansible/devel/reference_appendices/interpreter_discovery.html
             "interpreter_python": "auto_silent",
@@ -131,26 +134,224 @@ def test_ansible_default_env_property(_instance):
     assert "MOLECULE_INSTANCE_CONFIG" in _instance.default_env
     assert "ANSIBLE_CONFIG" in _instance.env
     assert "ANSIBLE_ROLES_PATH" in _instance.env
-    assert "ANSIBLE_LIBRARY" in _instance.env
-    assert "ANSIBLE_FILTER_PLUGINS" in _instance.env
+    assert "ANSIBLE_CALLBACK_PLUGINS" in _instance.env
+    assert "MOLECULE_EVENTS_FILE" in _instance.default_env
+
+
+def test_default_env_prunes_missing_paths(_instance):
+    library = os.path.join(_instance._config.project_directory, "library")
+    os.makedirs(library)
+    ephemeral_directory = _instance._config.scenario.ephemeral_directory
+    ephemeral_roles = os.path.join(ephemeral_directory, "roles")
+    ephemeral_library = os.path.join(ephemeral_directory, "library")
+
+    roles = _instance.default_env["ANSIBLE_ROLES_PATH"].split(":")
+    assert roles[0] == ephemeral_roles
+    assert all(os.path.isdir(path) for path in roles[1:])
+    assert len(roles) == len(set(roles))
+    assert library in _instance.default_env["ANSIBLE_LIBRARY"].split(":")
+    assert all(
+        os.path.isdir(path) or path == ephemeral_library
+        for path in _instance.default_env["ANSIBLE_LIBRARY"].split(":")
+    )
+
+
+def test_prune_paths(_instance, tmp_path):
+    existing = str(tmp_path)
+    missing = str(tmp_path / "missing")
+    kept = str(tmp_path / "kept")
+    paths = [None, missing, existing, existing + "/.", kept]
+
+    assert _instance._prune_paths(paths, keep=[kept]) == [existing, kept]
+
+    (tmp_path / "missing").mkdir()
+    assert _instance._prune_paths(paths, keep=[kept]) == [missing, existing, kept]
+
+
+def test_env_picks_up_created_paths(_instance):
+    library = os.path.join(_instance._config.project_directory, "library")
+    assert library not in _instance.env["ANSIBLE_LIBRARY"].split(":")
+
+    os.makedirs(library)
+    _instance._config.invalidate_env()
+
+    assert library in _instance.env["ANSIBLE_LIBRARY"].split(":")
+
+
+def test_callback_plugins_include_molecule_events(_instance):
+    paths = _instance.env["ANSIBLE_CALLBACK_PLUGINS"].split(":")
+
+    assert os.path.isfile(os.path.join(paths[0], "molecule_events.py"))
+    assert all(os.path.isdir(path) for path in paths)
+
+
+def test_molecule_events_counts_ok_changes_only(
+    _instance,
+    mocker,
+    monkeypatch,
+    tmp_path,
+):
+    events_file = tmp_path / "events.jsonl"
+    monkeypatch.setenv("MOLECULE_EVENTS_FILE", str(events_file))
+    path = os.path.join(
+        _instance._get_plugin_directory(),
+        "callback",
+        "molecule_events.py",
+    )
+    spec = importlib.util.spec_from_file_location("molecule_events", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    callback = module.CallbackModule()
+    result = mocker.Mock(_result={"changed": True})
+    result._host.get_name.return_value = "instance"
+    result._task.get_name.return_value = "task"
+
+    callback.v2_runner_on_failed(result)
+    callback.v2_runner_on_failed(result, ignore_errors=True)
+    callback.v2_runner_on_ok(result)
+    callback.v2_playbook_on_stats(None)
+
+    events = [json.loads(line) for line in events_file.read_text().splitlines()]
+    assert [(e["status"], e["changed"]) for e in events] == [
+        ("failed", False),
+        ("ignored", False),
+        ("changed", True),
+    ]
+    assert callback._changed == 1
 
 
 def test_provisioner_name_property(_instance):
     assert _instance.name == "ansible"
 
 
+def test_default_config_options_reuse_ssh_masters(_instance, monkeypatch):
+    monkeypatch.setenv("MOLECULE_SSH_REUSE", "true")
+    directory = ssh.control_directory(_instance._config.scenario.ephemeral_directory)
+
+    assert "control_path_dir" not in _instance.default_config_options["ssh_connection"]
+    assert not os.path.exists(directory)
+
+    _instance.write_config()
+    x = _instance.default_config_options["ssh_connection"]
+
+    assert "pipelining" not in x
+    assert x["control_path"] == "%(directory)s/%%C"
+    assert x["control_path_dir"] == directory
+    assert f"ControlPersist={ssh.CONTROL_PERSIST}" in x["ssh_args"]
+
+
+def test_default_config_options_pipelining(_instance, monkeypatch):
+    assert "pipelining" not in _instance.default_config_options["ssh_connection"]
+
+    del _instance.pipelining
+    monkeypatch.setenv("MOLECULE_SSH_PIPELINING", "true")
+
+    assert _instance.default_config_options["ssh_connection"]["pipelining"] is True
+
+
+GATHER_SUBSET_PLAYBOOK = """
+- hosts: localhost
+  gather_subset: ["!all"]
+  tasks: []
+- hosts: localhost
+  gather_subset: ["!all", "network"]
+  tasks:
+    - assert:
+        that: ansible_interfaces is defined
+"""
+
+
+@pytest.mark.parametrize(("fact_caching", "rc"), ((False, 0), (True, 2)))
+def test_fact_caching_gather_subset(
+    _instance,
+    monkeypatch,
+    tmp_path,
+    fact_caching,
+    rc,
+):
+    monkeypatch.setenv("MOLECULE_FACT_CACHE", str(fact_caching))
+    _instance.write_config()
+    defaults = _instance.default_config_options["defaults"]
+    assert ("gathering" in defaults) is fact_caching
+
+    playbook = tmp_path / "playbook.yml"
+    playbook.write_text(GATHER_SUBSET_PLAYBOOK)
+    env = dict(
+        os.environ,
+        ANSIBLE_CONFIG=_instance.config_file,
+        ANSIBLE_LOCALHOST_WARNING="false",
+        ANSIBLE_INVENTORY_UNPARSED_WARNING="false",
+    )
+    result = subprocess.run(
+        ["ansible-playbook", "-c", "local", str(playbook)],
+        env=env,
+        check=False,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    # with the cache, the second play reuses the facts of the first subset
+    assert result.returncode == rc
+
+
+def test_forks_property(_instance, monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1}, raising=False)
+    assert _instance.forks == 2
+
+    del _instance.forks
+    _instance._config.config["platforms"] *= 10
+    assert _instance.forks == 8
+
+    del _instance.forks
+    monkeypatch.setenv("MOLECULE_CONCURRENT_SCENARIOS", "3")
+    assert _instance.forks == 2
+
+    del _instance.forks
+    monkeypatch.setenv("MOLECULE_CONCURRENT_SCENARIOS", "0")
+    with pytest.raises(SystemExit):
+        _instance.forks
+
+
+@pytest.mark.parametrize(
+    "inventory",
+    ({"hosts": {"all": {"hosts": {"extra": {}}}}}, {"links": {"hosts": "hosts"}}),
+)
+def test_forks_property_with_inventory_hosts(_instance, monkeypatch, inventory):
+    monkeypatch.setattr(
+        os,
+        "sched_getaffinity",
+        lambda pid: set(range(64)),
+        raising=False,
+    )
+    _instance._config.config["provisioner"]["inventory"].update(inventory)
+
+    assert _instance.forks == ansible.MAX_FORKS
+
+
+def test_strategy_property(_instance, monkeypatch):
+    assert _instance.strategy is None
+    assert "strategy" not in _instance.default_config_options["defaults"]
+
+    del _instance.strategy
+    monkeypatch.setenv("MOLECULE_ANSIBLE_STRATEGY", "free")
+    assert _instance.default_config_options["defaults"]["strategy"] == "free"
+
+
 @pytest.mark.parametrize(
     "config_instance",
     ["_provisioner_section_data"],
     indirect=True,
 )
-def test_config_options_property(_instance):
+def test_config_options_property(_instance, monkeypatch):
+    # the inventory adds hosts, forks are only capped by the CPUs
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0}, raising=False)
     x = {
         "defaults": {
             "ansible_managed": "Ansible managed: Do NOT edit this file manually!",
             "display_failed_stderr": True,
             "foo": "bar",
-            "forks": 50,
+            "forks": ansible.FORKS_PER_CPU,
             "host_key_checking": False,
             "interpreter_python": "auto_silent",
             "nocows": 1,
@@ -213,30 +414,33 @@ def test_provisioner_env_property(_instance):
     indirect=True,
 )
 def test_env_appends_env_property(_instance):
-    x = _instance._get_modules_directories()
+    ephemeral_directory = _instance._config.scenario.ephemeral_directory
+    x = _instance._prune_paths(
+        _instance._get_modules_directories(),
+        keep=[os.path.join(ephemeral_directory, "library")],
+    )
     x.append(
         util.abs_path(os.path.join(_instance._config.scenario.directory, "foo", "bar")),
     )
     assert x == _instance.env["ANSIBLE_LIBRARY"].split(":")
 
-    x = [
-        _instance._get_filter_plugin_directory(),
-        util.abs_path(
-            os.path.join(
-                _instance._config.scenario.ephemeral_directory,
-                "plugins",
-                "filter",
+    x = _instance._prune_paths(
+        [
+            _instance._get_filter_plugin_directory(),
+            os.path.join(ephemeral_directory, "plugins", "filter"),
+            util.abs_path(
+                os.path.join(_instance._config.project_directory, "plugins", "filter"),
             ),
-        ),
-        util.abs_path(
-            os.path.join(_instance._config.project_directory, "plugins", "filter"),
-        ),
-        util.abs_path(
-            os.path.join(os.path.expanduser("~"), ".ansible", "plugins", "filter"),
-        ),
-        "/usr/share/ansible/plugins/filter",
+            util.abs_path(
+                os.path.join(os.path.expanduser("~"), ".ansible", "plugins", "filter"),
+            ),
+            "/usr/share/ansible/plugins/filter",
+        ],
+        keep=[os.path.join(ephemeral_directory, "plugins", "filter")],
+    )
+    x.append(
         util.abs_path(os.path.join(_instance._config.scenario.directory, "foo", "bar")),
-    ]
+    )
     assert x == _instance.env["ANSIBLE_FILTER_PLUGINS"].split(":")
 
 
@@ -287,6 +491,157 @@ def test_inventory_directory_property(_instance):
     assert x == _instance.inventory_directory
 
 
+def test_inventory_format_property(_instance, monkeypatch):
+    assert _instance.inventory_format == "yaml"
+
+    monkeypatch.setattr(ansible, "JSON_INVENTORY_THRESHOLD", 1)
+    assert _instance.inventory_format == "json"
+
+    _instance._config.config["provisioner"]["inventory"]["format"] = "yaml"
+    assert _instance.inventory_format == "yaml"
+
+
+@pytest.mark.parametrize(
+    "config_instance",
+    ["_provisioner_section_data"],
+    indirect=True,
+)
+def test_write_json_inventory(_instance):
+    _instance._config.config["provisioner"]["inventory"]["format"] = "json"
+    inventory_dir = _instance._config.scenario.inventory_directory
+
+    _instance.manage_inventory()
+
+    with open(_instance.inventory_file) as f:
+        assert json.load(f) == util.safe_load_file(_instance.inventory_file)
+    with open(os.path.join(inventory_dir, "host_vars", "instance-1")) as f:
+        assert json.load(f) == _instance.host_vars["instance-1"]
+
+
+def test_write_inventory_molecule_vars(_instance):
+    _instance._config.config["foo"] = "{{ undefined_thing }}"
+    _instance._write_inventory()
+
+    with open(_instance.molecule_vars_file) as f:
+        assert "foo: !unsafe '{{ undefined_thing }}'" in f.read()
+    assert (
+        _instance.inventory["all"]["vars"]["molecule_scenario_directory"]
+        == _instance._config.scenario.directory
+    )
+
+    result = subprocess.run(
+        [
+            "ansible-inventory",
+            "--inventory",
+            _instance.inventory_directory,
+            "--host",
+            "instance-1",
+        ],
+        env=dict(os.environ, ANSIBLE_INVENTORY_UNPARSED_WARNING="false"),
+        check=True,
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        text=True,
+    )
+    host_vars = json.loads(result.stdout)
+    assert "molecule_yml" in host_vars
+    assert host_vars["molecule_file"] == _instance._config.config_file
+    assert _template_var(_instance, "molecule_yml.driver.name") == "default"
+    assert _template_var(_instance, "molecule_yml.foo") == "{{ undefined_thing }}"
+
+
+def _template_var(_instance, var):
+    """Return the value of var templated by Ansible for the implicit localhost."""
+    result = subprocess.run(
+        [
+            "ansible",
+            "localhost",
+            "--inventory",
+            _instance.inventory_directory,
+            "--connection",
+            "local",
+            "--module-name",
+            "debug",
+            "--args",
+            f"var={var}",
+        ],
+        env=dict(
+            _instance.env,
+            ANSIBLE_FORCE_COLOR="false",
+            ANSIBLE_NOCOLOR="true",
+            ANSIBLE_INVENTORY_UNPARSED_WARNING="false",
+        ),
+        check=True,
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        text=True,
+    )
+    return json.loads(result.stdout.split("=>", 1)[1])[var]
+
+
+def _ansible_inventory(_instance, *args):
+    result = subprocess.run(
+        ["ansible-inventory", "--inventory", _instance.inventory_directory, *args],
+        env=dict(_instance.env, ANSIBLE_INVENTORY_UNPARSED_WARNING="false"),
+        check=True,
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_manage_inventory_plugin_format(_instance):
+    inventory = _instance._config.config["provisioner"]["inventory"]
+    inventory["format"] = "plugin"
+    inventory["hosts"] = {
+        "all": {"children": {"extra": {"hosts": {"extra-host-01": {}}}}},
+    }
+    inventory["host_vars"] = {"instance-1": {"foo": "bar"}, "localhost": {"foo": "baz"}}
+    inventory["group_vars"] = {"extra": {"foo": "qux"}}
+    _instance._config.config["foo"] = "{{ undefined_thing }}"
+    inventory_dir = _instance.inventory_directory
+
+    _instance.manage_inventory()
+
+    config = util.safe_load_file(_instance.inventory_file)
+    assert config["plugin"] == "molecule_inventory"
+    assert config["data"] == f"{ansible.INVENTORY_DATA_PREFIX}{config['digest']}.json"
+    assert sorted(os.listdir(inventory_dir)) == [
+        config["data"],
+        "ansible_inventory.yml",
+    ]
+
+    data = _ansible_inventory(_instance, "--list")
+    assert "extra" in data["all"]["children"]
+    assert data["extra"]["hosts"] == ["extra-host-01"]
+    host_vars = data["_meta"]["hostvars"]
+    assert host_vars["instance-1"]["foo"] == "bar"
+    assert host_vars["extra-host-01"]["foo"] == "qux"
+    assert "molecule_yml" in host_vars["instance-2"]
+    assert _ansible_inventory(_instance, "--host", "localhost")["foo"] == "baz"
+    assert _template_var(_instance, "molecule_yml.driver.name") == "default"
+    assert _template_var(_instance, "molecule_yml.foo") == "{{ undefined_thing }}"
+
+    inventory["host_vars"]["instance-1"]["foo"] = "changed"
+    _instance.manage_inventory()
+    inventory["host_vars"]["instance-1"]["foo"] = "changed again"
+    _instance.manage_inventory()
+
+    assert len(os.listdir(inventory_dir)) == 3
+    host_vars = _ansible_inventory(_instance, "--host", "instance-1")
+    assert host_vars["foo"] == "changed again"
+
+    inventory["format"] = "yaml"
+    _instance.manage_inventory()
+
+    assert "hosts" in os.listdir(inventory_dir)
+    assert not any(
+        name.startswith(ansible.INVENTORY_DATA_PREFIX)
+        for name in os.listdir(inventory_dir)
+    )
+
+
 def test_inventory_file_property(_instance):
     x = os.path.join(
         _instance._config.scenario.inventory_directory,
@@ -473,7 +828,7 @@ def test_manage_inventory(
     _instance.manage_inventory()
 
     _patched_write_inventory.assert_called_once_with()
-    _patched_remove_vars.assert_called_once_with()
+    _patched_remove_vars.assert_called_once_with(keep=[])
     patched_add_or_update_vars.assert_called_once_with()
     assert not _patched_link_or_update_vars.called
 
@@ -490,7 +845,7 @@ def test_manage_inventory_with_links(
     _instance.manage_inventory()
 
     _patched_write_inventory.assert_called_once_with()
-    _patched_remove_vars.assert_called_once_with()
+    _patched_remove_vars.assert_called_once_with(keep=[])
     assert not patched_add_or_update_vars.called
     _patched_link_or_update_vars.assert_called_once_with()
 
@@ -654,6 +1009,80 @@ def test_link_vars(_instance):
     assert os.path.lexists(target_host_vars)
 
 
+def test_clear_facts(_instance):
+    path = os.path.join(_instance.fact_cache_directory, "instance-1")
+    os.makedirs(_instance.fact_cache_directory)
+    with open(path, "w") as f:
+        f.write("{}")
+
+    _instance.clear_facts()
+
+    assert not os.path.exists(_instance.fact_cache_directory)
+    _instance.clear_facts()
+
+
+@pytest.mark.parametrize(
+    "config_instance",
+    ["_provisioner_section_data"],
+    indirect=True,
+)
+def test_manage_inventory_skips_unchanged_vars(_instance):
+    inventory_dir = _instance._config.scenario.inventory_directory
+    host_vars = os.path.join(inventory_dir, "host_vars", "instance-1")
+
+    _instance.manage_inventory()
+    os.utime(host_vars, ns=(0, 0))
+    _instance.manage_inventory()
+
+    assert os.stat(host_vars).st_mtime_ns == 0
+    assert os.path.islink(os.path.join(inventory_dir, "host_vars"))
+
+
+@pytest.mark.parametrize(
+    "config_instance",
+    ["_provisioner_section_data"],
+    indirect=True,
+)
+def test_manage_inventory_swaps_vars_generation(_instance):
+    inventory_dir = _instance._config.scenario.inventory_directory
+    generations = os.path.join(inventory_dir, ansible.VARS_DIRECTORY)
+    group_vars = _instance._config.config["provisioner"]["inventory"]["group_vars"]
+
+    current = os.path.join(generations, ansible.CURRENT_VARS)
+
+    _instance.manage_inventory()
+    link = os.readlink(os.path.join(inventory_dir, "group_vars"))
+    first = os.readlink(current)
+    util.write_file(f"{current}.{os.getpid()}", "")
+    for i in range(3):
+        group_vars["example_group1"] = {"generation": i}
+        _instance.manage_inventory()
+
+    # the tree is swapped with the current symlink only
+    assert os.readlink(os.path.join(inventory_dir, "group_vars")) == link
+    assert os.readlink(current) != first
+    assert len(os.listdir(generations)) == 3
+    assert util.safe_load_file(
+        os.path.join(inventory_dir, "group_vars", "example_group1"),
+    ) == {"generation": 2}
+    assert not [f for f in os.listdir(generations) if f.endswith(".tmp")]
+
+
+def test_link_vars_keeps_existing_links(_instance, mocker):
+    c = _instance._config.config
+    c["provisioner"]["inventory"]["links"] = {"group_vars": "../group_vars"}
+    scenario_dir = _instance._config.scenario.directory
+    os.mkdir(os.path.join(scenario_dir, os.path.pardir, "group_vars"))
+
+    _instance.manage_inventory()
+    m = mocker.patch("os.symlink")
+    _instance.manage_inventory()
+
+    assert not m.called
+    target = os.path.join(_instance._config.scenario.inventory_directory, "group_vars")
+    assert os.path.islink(target)
+
+
 def test_link_vars_raises_when_source_not_found(_instance, caplog):
     c = _instance._config.config
     c["provisioner"]["inventory"]["links"] = {"foo": "../bar"}
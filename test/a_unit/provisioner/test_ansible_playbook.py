@@ -18,11 +18,13 @@
 #  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 
+import os
 from subprocess import CompletedProcess
 
 import pytest
 
-from molecule import config
+from molecule import config, events
+from molecule.constants import RC_ABORTED
 from molecule.provisioner import ansible_playbook
 
 
@@ -253,6 +255,54 @@ def test_executes_catches_and_exits_return_code(
     assert e.value.code == 1
 
 
+@pytest.mark.parametrize(
+    ("changed", "cleared"),
+    ((False, False), (True, True)),
+)
+def test_execute_clears_facts_after_changes(
+    patched_run_command,
+    _instance,
+    changed,
+    cleared,
+):
+    events_file = _instance._config.provisioner.events_file
+    facts = _instance._config.provisioner.fact_cache_directory
+    os.makedirs(facts)
+
+    def run(**kwargs):
+        with open(events_file, "w") as f:
+            f.write(
+                '{"play": "p", "task": "t", "host": "h", "status": "ok", '
+                f'"changed": {str(changed).lower()}, "duration": 0.1}}\n',
+            )
+        return CompletedProcess(args=[], returncode=0, stdout="out")
+
+    patched_run_command.side_effect = run
+    _instance.execute()
+
+    assert os.path.isdir(facts) is not cleared
+
+
+def test_execute_tolerates_requested_abort(patched_run_command, _instance):
+    events_file = _instance._config.provisioner.events_file
+    _instance._abort_after = 1
+
+    def run(**kwargs):
+        with open(events_file + events.ABORT_SUFFIX) as f:
+            assert f.read() == "1\n"
+        with open(events_file, "w") as f:
+            f.write(
+                '{"play": "p", "task": "t", "host": "h", "status": "changed", '
+                '"changed": true, "duration": 0.1}\n',
+            )
+        return CompletedProcess(args=[], returncode=RC_ABORTED, stdout="out")
+
+    patched_run_command.side_effect = run
+
+    assert _instance.execute() == "out"
+    assert not os.path.exists(events_file + events.ABORT_SUFFIX)
+
+
 def test_add_cli_arg(_instance):
     assert {} == _instance._cli
 
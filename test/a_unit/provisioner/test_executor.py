@@ -0,0 +1,151 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+import concurrent.futures
+import os
+
+import pytest
+
+from molecule.provisioner import executor
+
+PLAYBOOK = """\
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - debug:
+        msg: "value={{ lookup('env', 'FOO') }}"
+    - fail:
+        msg: failed on purpose
+      when: lookup('env', 'FOO') == 'fail'
+"""
+
+
+@pytest.fixture()
+def _playbook(tmp_path):
+    path = tmp_path / "playbook.yml"
+    path.write_text(PLAYBOOK)
+    yield str(path)
+    executor.shutdown()
+
+
+@pytest.fixture()
+def _helper_executor(monkeypatch):
+    monkeypatch.setenv("MOLECULE_ANSIBLE_EXECUTOR", "helper")
+
+
+def _env(value):
+    return dict(
+        os.environ,
+        FOO=value,
+        ANSIBLE_LOCALHOST_WARNING="false",
+        ANSIBLE_INVENTORY_UNPARSED_WARNING="false",
+    )
+
+
+def test_run_uses_run_command_by_default(patched_run_command):
+    result = executor.run(["ansible-playbook", "playbook.yml"], env={})
+
+    assert result.stdout == "patched-run-command-stdout"
+    patched_run_command.assert_called_once_with(
+        cmd=["ansible-playbook", "playbook.yml"],
+        env={},
+        debug=False,
+        cwd=None,
+    )
+
+
+def test_run_rejects_unknown_executor(monkeypatch):
+    monkeypatch.setenv("MOLECULE_ANSIBLE_EXECUTOR", "unknown")
+
+    with pytest.raises(SystemExit):
+        executor.run(["ansible-playbook", "playbook.yml"])
+
+
+def test_run_in_helper(_helper_executor, _playbook, capsys):
+    cwd = os.path.dirname(_playbook)
+    result = executor.run(["ansible-playbook", _playbook], env=_env("a"), cwd=cwd)
+    zygote = executor.pool.get(_env("a") | executor.FORCED_ENV, cwd)
+
+    assert result.returncode == 0
+    assert "value=a" in result.stdout
+    assert "value=a" in capsys.readouterr().out
+
+    with concurrent.futures.ThreadPoolExecutor(2) as pool:
+        results = list(
+            pool.map(
+                lambda value: executor.run(
+                    ["ansible-playbook", _playbook],
+                    env=_env(value),
+                    cwd=cwd,
+                ),
+                ("a", "a"),
+            ),
+        )
+    assert [r.returncode for r in results] == [0, 0]
+    assert list(executor.pool._zygotes.values()) == [zygote]
+
+    result = executor.run(["ansible-playbook", _playbook], env=_env("fail"), cwd=cwd)
+    assert result.returncode == 2
+    assert "failed on purpose" in result.stdout
+    assert len(executor.pool._zygotes) == 2
+
+
+def test_pool_stops_least_recently_used_zygote(_helper_executor, _playbook, mocker):
+    mocker.patch.object(executor, "MAX_ZYGOTES", 1)
+    cwd = os.path.dirname(_playbook)
+    first = executor.pool.get(_env("a"), cwd)
+    second = executor.pool.get(_env("b"), cwd)
+
+    assert first is not None
+    assert not first.alive()
+    assert list(executor.pool._zygotes.values()) == [second]
+
+
+def test_run_falls_back_when_helper_fails(
+    _helper_executor,
+    _playbook,
+    patched_run_command,
+    mocker,
+):
+    zygote = mocker.patch.object(executor, "Zygote")
+    zygote.return_value.ready.return_value = False
+
+    result = executor.run(["ansible-playbook", _playbook], env={})
+
+    assert result.stdout == "patched-run-command-stdout"
+    assert not executor.pool._zygotes
+
+
+def test_key_follows_ansible_cfg(tmp_path):
+    env = {"HOME": str(tmp_path / "home")}
+    cwd = str(tmp_path)
+    config_file = tmp_path / "ansible.cfg"
+    before = executor._key(env, cwd)
+
+    config_file.write_text("[defaults]\n")
+    os.utime(config_file, ns=(1, 1))
+    created = executor._key(env, cwd)
+    os.utime(config_file, ns=(2, 2))
+
+    assert created[2] == str(config_file)
+    assert len({before, created, executor._key(env, cwd)}) == 3
+    (tmp_path / "other.cfg").write_text("[defaults]\n")
+    assert executor._key(dict(env, ANSIBLE_CONFIG="other.cfg"), cwd)[2] == str(
+        tmp_path / "other.cfg",
+    )
@@ -0,0 +1,125 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+import os
+
+import pytest
+
+from molecule import caches, util
+
+
+@pytest.fixture()
+def _cache(monkeypatch, tmp_path):
+    monkeypatch.delenv("MOLECULE_EPHEMERAL_DIRECTORY", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    for i, project in enumerate(("old", "created", "new")):
+        scenario = tmp_path / "molecule" / project / "default"
+        scenario.mkdir(parents=True)
+        util.write_file(str(scenario / "data"), "x" * 1000)
+        util.write_file(
+            str(scenario / "state.yml"),
+            util.safe_dump({"created": project == "created"}),
+        )
+        os.utime(scenario.parent, (i, i))
+    return tmp_path
+
+
+def test_root_ignores_ephemeral_directory(_cache, monkeypatch, tmp_path_factory):
+    monkeypatch.setenv(
+        "MOLECULE_EPHEMERAL_DIRECTORY",
+        str(tmp_path_factory.mktemp("ephemeral")),
+    )
+
+    assert caches.root() == str(_cache)
+    assert caches.directory("foo") == str(_cache / "molecule" / ".shared" / "foo")
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    (("1024", 1024), ("2k", 2048), ("1.5M", 1572864), ("5GiB", 5 * 1024**3)),
+)
+def test_parse_size(value, expected):
+    assert caches.parse_size(value) == expected
+
+
+def test_parse_size_invalid():
+    with pytest.raises(ValueError, match="Invalid cache size"):
+        caches.parse_size("lots")
+
+
+def test_entries(_cache):
+    entries = caches.entries()
+
+    assert [os.path.basename(e.path) for e in entries] == ["old", "created", "new"]
+    assert [e.active for e in entries] == [False, True, False]
+    assert all(e.size > 1000 for e in entries)
+
+
+def test_prune_evicts_least_recently_used(_cache):
+    removed = caches.prune(2500)
+
+    assert [os.path.basename(e.path) for e in removed] == ["old"]
+    assert not (_cache / "molecule" / "old").exists()
+    assert (_cache / "molecule" / "created").exists()
+
+
+def test_unreadable_state_is_active(_cache):
+    util.write_file(str(_cache / "molecule" / "old" / "default" / "state.yml"), "[")
+
+    assert [e.active for e in caches.entries()] == [True, True, False]
+
+
+def test_prune_skips_active_and_kept_entries(_cache):
+    keep = [str(_cache / "molecule" / "new" / "default")]
+
+    assert [os.path.basename(e.path) for e in caches.prune(0, keep=keep)] == ["old"]
+    assert (_cache / "molecule" / "new").exists()
+
+
+def test_clear(_cache):
+    assert len(caches.clear()) == 2
+    assert (_cache / "molecule" / "created").exists()
+
+    assert len(caches.clear(force=True)) == 1
+    assert not caches.entries()
+
+
+def test_shared_cache_entries(_cache):
+    util.write_file(os.path.join(caches.directory("discovery"), "index.json"), "{}")
+
+    assert os.path.basename(caches.entries()[-1].path) == "index.json"
+
+
+def test_prune_if_due(_cache, monkeypatch, mocker):
+    monkeypatch.setenv("MOLECULE_CACHE_MAX_SIZE", "0")
+    m = mocker.patch("molecule.caches.prune", return_value=[])
+
+    caches.prune_if_due()
+    caches.prune_if_due()
+
+    m.assert_called_once_with(keep=())
+
+
+def test_prune_if_due_is_opt_in(_cache, monkeypatch, mocker):
+    monkeypatch.delenv("MOLECULE_CACHE_MAX_SIZE", raising=False)
+    m = mocker.patch("molecule.caches.prune", return_value=[])
+
+    caches.prune_if_due()
+
+    assert not m.called
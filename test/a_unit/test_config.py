@@ -18,6 +18,7 @@
 #  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 #  DEALINGS IN THE SOFTWARE.
 
+import collections
 import os
 
 import pytest
@@ -119,6 +120,7 @@ def test_env(config_instance: config.Config):
         "MOLECULE_FILE": config_instance.config_file,
         "MOLECULE_ENV_FILE": util.abs_path(env_file),
         "MOLECULE_INVENTORY_FILE": config_instance.provisioner.inventory_file,
+        "MOLECULE_EVENTS_FILE": config_instance.provisioner.events_file,
         "MOLECULE_EPHEMERAL_DIRECTORY": config_instance.scenario.ephemeral_directory,
         "MOLECULE_SCENARIO_DIRECTORY": config_instance.scenario.directory,
         "MOLECULE_PROJECT_DIRECTORY": config_instance.project_directory,
@@ -284,6 +286,33 @@ def test_interpolate_raises_on_failed_interpolation(
     assert msg in caplog.text
 
 
+def test_load_caches_parsed_config(config_instance: config.Config, mocker):
+    string = "foo: ${MOLECULE_TEST_LOAD_VALUE}"
+    env = {"MOLECULE_TEST_LOAD_VALUE": "bar"}
+    m = mocker.spy(config_instance, "_substitute")
+    env_file = mocker.spy(config, "set_env_from_file")
+
+    assert config_instance._load(string, env, "") == {"foo": "bar"}
+    assert env_file.call_count == 1
+    assert config_instance._load(string, {**env, "OTHER": "x"}, "") == {"foo": "bar"}
+    assert m.call_count == 1
+
+    assert config_instance._load(string, {"MOLECULE_TEST_LOAD_VALUE": "baz"}, "") == {
+        "foo": "baz",
+    }
+    assert m.call_count == 2
+
+
+def test_load_bounds_parsed_configs(config_instance: config.Config, monkeypatch):
+    monkeypatch.setattr(config, "MAX_PARSED_CONFIGS", 2)
+    monkeypatch.setattr(config, "_parsed_configs", collections.OrderedDict())
+
+    for i in range(3):
+        assert config_instance._load(f"foo: {i}", {}, "") == {"foo": i}
+
+    assert [key[0] for key in config._parsed_configs] == ["foo: 1", "foo: 2"]
+
+
 def test_get_defaults(config_instance: config.Config, mocker):
     mocker.patch.object(
         config_instance,
@@ -357,3 +386,20 @@ def test_write_config(config_instance: config.Config):
     config_instance.write()
 
     assert os.path.isfile(config_instance.config_file)
+
+
+def test_env_is_cached_until_action_changes(config_instance: config.Config):
+    env = config_instance.env
+    provisioner_env = config_instance.provisioner.env
+    rebuilds = dict(config_instance.env_rebuilds)
+
+    assert env is config_instance.env
+    assert provisioner_env is config_instance.provisioner.env
+    assert rebuilds == config_instance.env_rebuilds
+
+    config_instance.action = "converge"
+
+    assert env is not config_instance.env
+    assert provisioner_env is not config_instance.provisioner.env
+    assert config_instance.env_rebuilds["config"] == rebuilds["config"] + 1
+    assert config_instance.env_rebuilds["provisioner"] == rebuilds["provisioner"] + 1
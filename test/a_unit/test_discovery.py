@@ -0,0 +1,220 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+import os
+import shutil
+import struct
+import subprocess
+
+import pytest
+from wcmatch import glob
+
+from molecule import discovery
+
+
+@pytest.fixture()
+def _tree(temp_dir):
+    for path in (
+        "molecule/default/molecule.yml",
+        "molecule/other/molecule.yml",
+        "molecule/other/nested/molecule/deep/molecule.yml",
+        "roles/foo/molecule/default/molecule.yml",
+        ".tox/py/molecule/default/molecule.yml",
+    ):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write("")
+    return temp_dir
+
+
+@pytest.fixture()
+def _index_file(_tree, monkeypatch):
+    path = os.path.join(_tree.strpath, "index.json")
+    monkeypatch.setattr(discovery, "index_file", lambda root: path)
+    return path
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    (
+        "molecule/*/molecule.yml",
+        "molecule/default/molecule.yml",
+        "molecule/{default,other}/molecule.yml",
+        "roles/**/molecule/*/molecule.yml",
+    ),
+)
+def test_find_matches_glob(_index_file, pattern):
+    expected = sorted(glob.glob(pattern, flags=discovery.GLOB_FLAGS))
+
+    assert discovery.find(pattern) == expected
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    (
+        "roles/*/molecule/*/molecule.yml",
+        "roles/*/**/molecule.yml",
+    ),
+)
+def test_find_follows_symlinks_like_glob(_index_file, pattern):
+    os.symlink("foo", "roles/linked")
+
+    expected = sorted(glob.glob(pattern, flags=discovery.GLOB_FLAGS))
+
+    assert "roles/linked/molecule/default/molecule.yml" in expected
+    assert discovery.find(pattern) == expected
+
+
+def test_find_skips_ignored_directories(_index_file):
+    assert discovery.find("**/molecule/*/molecule.yml") == [
+        "molecule/default/molecule.yml",
+        "molecule/other/molecule.yml",
+        "molecule/other/nested/molecule/deep/molecule.yml",
+        "roles/foo/molecule/default/molecule.yml",
+    ]
+
+
+def test_find_reuses_index(_index_file, mocker, monkeypatch):
+    monkeypatch.setattr(discovery, "RACY_INTERVAL_NS", 0)
+    discovery.find("molecule/*/molecule.yml")
+    assert os.path.isfile(_index_file)
+
+    m = mocker.patch("molecule.discovery._scandir", wraps=discovery._scandir)
+    assert discovery.find("molecule/*/molecule.yml") == [
+        "molecule/default/molecule.yml",
+        "molecule/other/molecule.yml",
+    ]
+    assert not m.called
+
+    os.makedirs("molecule/new")
+    with open("molecule/new/molecule.yml", "w") as f:
+        f.write("")
+    assert "molecule/new/molecule.yml" in discovery.find("molecule/*/molecule.yml")
+    assert m.called
+
+
+@pytest.fixture()
+def _repo(_tree):
+    os.makedirs(".git/info")
+    with open(".git/info/exclude", "w") as f:
+        f.write("roles/foo/\n")
+    with open(".gitignore", "w") as f:
+        f.write("# comment\n/molecule/*\n!/molecule/default\n")
+    with open("molecule/other/.gitignore", "w") as f:
+        f.write("deep/\n")
+    return _tree
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "is_dir", "expected"),
+    (
+        ("foo", "a/b/foo", False, True),
+        ("foo/", "a/foo", False, False),
+        ("foo/", "a/foo", True, True),
+        ("/foo", "a/foo", False, False),
+        ("a/foo", "a/foo", False, True),
+        ("a/*.yml", "a/b/c.yml", False, False),
+        ("**/foo", "a/b/foo", False, True),
+        ("a/**", "a/b/c", False, True),
+        ("a/**/c", "a/c", False, True),
+        ("a/**/c", "a/b/b/c", False, True),
+        ("*.py[co]", "x/y.pyc", False, True),
+        ("[!a]b", "ab", False, False),
+        ("\\#foo", "#foo", False, True),
+        ("foo\\ ", "foo ", False, True),
+    ),
+)
+def test_gitignore_pattern(temp_dir, pattern, path, is_dir, expected):
+    regex, negate, dir_only = discovery._compile_pattern(pattern)
+
+    assert not negate
+    assert bool(regex.match(path) and (is_dir or not dir_only)) is expected
+
+
+def test_gitignore_precedence(_repo):
+    gitignore = discovery.GitIgnore(".")
+
+    assert gitignore.ignored("molecule/other/molecule.yml")
+    assert not gitignore.ignored("molecule/default/molecule.yml")
+    assert gitignore.ignored("roles/foo/molecule/default/molecule.yml")
+    assert not gitignore.ignored("molecule")
+
+
+def test_gitignore_outside_repository(_tree):
+    assert not discovery.GitIgnore(".").ignored("molecule/other/molecule.yml")
+
+
+def test_find_skips_gitignored_paths(_repo, _index_file, mocker):
+    m = mocker.patch("molecule.discovery._scandir", wraps=discovery._scandir)
+
+    assert discovery.find("**/molecule/*/molecule.yml") == [
+        "molecule/default/molecule.yml",
+    ]
+    listed = [os.path.relpath(c.args[0], _repo.strpath) for c in m.call_args_list]
+    assert "roles/foo" not in listed
+    assert "molecule/other" not in listed
+
+
+@pytest.mark.skipif(not shutil.which("git"), reason="git is not installed")
+def test_gitignore_skips_tracked_files(_repo, _index_file, monkeypatch):
+    monkeypatch.setenv("HOME", _repo.strpath)
+    monkeypatch.setenv("XDG_CONFIG_HOME", _repo.strpath)
+    subprocess.run(["git", "init", "-q"], check=True)
+    subprocess.run(["git", "add", "-f", "molecule/other/molecule.yml"], check=True)
+    gitignore = discovery.GitIgnore(".")
+
+    assert not gitignore.ignored("molecule/other/molecule.yml")
+    assert gitignore.ignored("molecule/other/nested/molecule/deep/molecule.yml")
+    assert discovery.find("**/molecule/*/molecule.yml") == [
+        "molecule/default/molecule.yml",
+        "molecule/other/molecule.yml",
+    ]
+
+
+@pytest.mark.parametrize("version", (2, 3, 4))
+def test_parse_index(temp_dir, version):
+    entries = [b"molecule/default/molecule.yml", b"molecule/other/molecule.yml"]
+    data = b"DIRC" + struct.pack(">II", version, len(entries))
+    previous = b""
+    for name in entries:
+        entry = bytes(60) + struct.pack(">H", len(name))
+        if version == 4:
+            common = len(os.path.commonprefix([previous, name]))
+            entry += bytes([len(previous) - common]) + name[common:] + b"\0"
+        else:
+            entry += name + b"\0" * (8 - (len(entry) + len(name)) % 8)
+        data += entry
+        previous = name
+    path = os.path.join(temp_dir.strpath, "index")
+    with open(path, "wb") as f:
+        f.write(data)
+
+    assert discovery._read_index(path) == {name.decode() for name in entries}
+
+
+def test_gitignore_reads_core_excludes_file(_repo, monkeypatch):
+    monkeypatch.setenv("HOME", _repo.strpath)
+    monkeypatch.setenv("XDG_CONFIG_HOME", _repo.strpath)
+    with open("excludes", "w") as f:
+        f.write("*.bak\n")
+    with open(".git/config", "w") as f:
+        f.write('[core "other"]\n\texcludesFile = nothing\n')
+        f.write('[Core]\n\tExcludesFile = "~/excludes"  ; comment\n')
+
+    assert discovery.GitIgnore(".").ignored("molecule.yml.bak")
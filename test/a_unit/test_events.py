@@ -0,0 +1,128 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+import json
+import os
+import subprocess
+
+from molecule import events
+from molecule.constants import RC_ABORTED
+from molecule.provisioner import ansible
+
+EVENT = {
+    "play": "all",
+    "task": "install",
+    "host": "instance",
+    "status": "changed",
+    "changed": True,
+    "duration": 0.5,
+}
+
+
+def test_reader_returns_new_events(tmp_path):
+    path = tmp_path / "events.jsonl"
+    reader = events.EventReader(str(path))
+
+    assert reader.read() == []
+
+    line = json.dumps(EVENT) + "\n"
+    path.write_text(line + line[:10])
+    assert reader.read() == [events.Event(**EVENT)]
+
+    with path.open("a") as f:
+        f.write(line[10:] + "not json\n")
+    assert reader.read() == [events.Event(**EVENT)]
+    assert reader.read() == []
+
+
+def test_load(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+
+    assert events.load(path) is None
+    with open(path, "w") as f:
+        f.write(json.dumps(EVENT) + "\n")
+    assert events.changed(events.load(path)) == [events.Event(**EVENT)]
+    assert str(events.load(path)[0]) == "* [instance] => install"
+
+    events.clear(path)
+    assert not os.path.exists(path)
+
+
+PLAYBOOK = """\
+- hosts: localhost
+  gather_facts: false
+  tasks:
+    - name: change
+      command: "true"
+    - name: skip
+      debug:
+        msg: skipped
+      when: false
+    - name: change again
+      command: "true"
+"""
+
+
+def _run_playbook(tmp_path):
+    playbook = tmp_path / "playbook.yml"
+    playbook.write_text(PLAYBOOK)
+    directory = os.path.join(
+        os.path.dirname(ansible.__file__),
+        "ansible",
+        "plugins",
+        "callback",
+    )
+    env = dict(
+        os.environ,
+        ANSIBLE_CALLBACK_PLUGINS=directory,
+        ANSIBLE_LOCALHOST_WARNING="false",
+        ANSIBLE_INVENTORY_UNPARSED_WARNING="false",
+        MOLECULE_EVENTS_FILE=str(tmp_path / "events.jsonl"),
+    )
+    return subprocess.run(
+        ["ansible-playbook", str(playbook)],
+        env=env,
+        check=False,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    ).returncode
+
+
+def test_callback_plugin_writes_events(tmp_path):
+    assert _run_playbook(tmp_path) == 0
+
+    recorded = events.load(str(tmp_path / "events.jsonl"))
+    assert [(e.task, e.status, e.changed) for e in recorded] == [
+        ("change", "changed", True),
+        ("skip", "skipped", False),
+        ("change again", "changed", True),
+    ]
+    assert {e.play for e in recorded} == {"localhost"}
+
+
+def test_callback_plugin_aborts_after_changes(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    events.abort_after(path, 1)
+
+    assert _run_playbook(tmp_path) == RC_ABORTED
+
+    assert [e.task for e in events.load(path)] == ["change"]
+    events.abort_after(path, 0)
+    assert not os.path.exists(path + events.ABORT_SUFFIX)
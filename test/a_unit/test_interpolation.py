@@ -128,3 +128,51 @@ def test_interpolate_with_molecule_yaml(_instance):
 """.strip()
 
     assert x == _instance.interpolate(data)
+
+
+def test_interpolate_variables(_instance):
+    string = "$FOO ${BAR:-$BAZ} ${QUX-def} $$ESCAPED $MOLECULE_SCENARIO_NAME"
+
+    assert _instance.variables(string) == {
+        "FOO",
+        "BAR",
+        "BAZ",
+        "QUX",
+        "MOLECULE_SCENARIO_NAME",
+    }
+    assert _instance.variables(string, keep_string="MOLECULE_") == {
+        "FOO",
+        "BAR",
+        "BAZ",
+        "QUX",
+    }
+
+
+def test_interpolate_variables_of_kept_placeholders(_mock_env):
+    string = "${FOO:-$MOLECULE_BAR} $MOLECULE_KEPT"
+    instance = interpolation.Interpolator(interpolation.TemplateWithDefaults, _mock_env)
+
+    assert instance.variables(string, keep_string="MOLECULE_") == {
+        "FOO",
+        "MOLECULE_BAR",
+    }
+
+    _mock_env.pop("FOO", None)
+    _mock_env["MOLECULE_BAR"] = "x"
+    key = instance.environment_key(string, keep_string="MOLECULE_")
+    rendered = instance.interpolate(string, keep_string="MOLECULE_")
+    _mock_env["MOLECULE_BAR"] = "y"
+    assert rendered != instance.interpolate(string, keep_string="MOLECULE_")
+    assert key != instance.environment_key(string, keep_string="MOLECULE_")
+
+
+def test_interpolate_environment_key_ignores_unrelated_variables(_mock_env):
+    string = "name: ${FOO}"
+    instance = interpolation.Interpolator(interpolation.TemplateWithDefaults, _mock_env)
+    key = instance.environment_key(string)
+
+    _mock_env["UNRELATED"] = "changed"
+    assert key == instance.environment_key(string)
+
+    _mock_env["FOO"] = "changed"
+    assert key != instance.environment_key(string)
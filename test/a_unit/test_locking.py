@@ -0,0 +1,93 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+import subprocess
+import sys
+
+import pytest
+
+from molecule import locking
+from molecule.constants import RC_TIMEOUT
+
+HOLDER = """
+import fcntl, sys, time
+f = open(sys.argv[1], "w")
+fcntl.lockf(f, fcntl.LOCK_EX)
+print("locked", flush=True)
+time.sleep(float(sys.argv[2]))
+"""
+
+
+@pytest.fixture()
+def _lock_file(tmp_path):
+    return str(tmp_path / ".lock")
+
+
+def _hold(path, seconds):
+    proc = subprocess.Popen(
+        [sys.executable, "-c", HOLDER, path, str(seconds)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert proc.stdout.readline().strip() == "locked"
+    return proc
+
+
+def test_acquire_once(_lock_file):
+    manager = locking.LockManager()
+
+    stats = manager.acquire(_lock_file)
+
+    assert stats.attempts == 1
+    assert manager.held(_lock_file)
+    assert manager.acquire(_lock_file) is stats
+    manager.release(_lock_file)
+    assert not manager.held(_lock_file)
+
+
+def test_acquire_waits_for_release(_lock_file):
+    proc = _hold(_lock_file, 0.3)
+    manager = locking.LockManager()
+
+    with proc:
+        stats = manager.acquire(_lock_file, timeout=10)
+
+    assert stats.attempts > 1
+    assert stats.waited > 0
+
+
+def test_acquire_timeout(_lock_file):
+    with _hold(_lock_file, 10) as proc, pytest.raises(SystemExit) as e:
+        try:
+            locking.LockManager().acquire(_lock_file, timeout=0.2)
+        finally:
+            proc.kill()
+
+    assert e.value.code == RC_TIMEOUT
+
+
+@pytest.mark.parametrize("value", ("soon", "-1", "nan"))
+def test_acquire_invalid_timeout(_lock_file, monkeypatch, caplog, value):
+    monkeypatch.setenv("MOLECULE_LOCK_TIMEOUT", value)
+
+    with pytest.raises(SystemExit) as e:
+        locking.LockManager().acquire(_lock_file)
+
+    assert e.value.code == 1
+    assert f"Invalid MOLECULE_LOCK_TIMEOUT '{value}'" in caplog.text
@@ -20,10 +20,11 @@
 
 import os
 import shutil
+import stat
 
 import pytest
 
-from molecule import config, scenario, util
+from molecule import config, locking, scenario, util
 
 
 # NOTE(retr0h): The use of the `patched_config_validate` fixture, disables
@@ -75,6 +76,33 @@ def test_prune(_instance):
         assert not os.path.isdir(os.path.join(e_dir, pruned_dir))
 
 
+def test_prune_keeps_safe_globs_and_links(_instance, tmp_path):
+    e_dir = _instance.ephemeral_directory
+    _instance.config.config["driver"]["safe_files"] = [os.path.join(e_dir, "keep*")]
+    os.makedirs(os.path.join(e_dir, "a", "b"))
+    for file in ("keep.txt", "a/keep-me", "a/b/drop"):
+        util.write_file(os.path.join(e_dir, file), "")
+    os.symlink(tmp_path, os.path.join(e_dir, "a", "link"))
+
+    _instance.prune()
+
+    assert os.path.isfile(os.path.join(e_dir, "keep.txt"))
+    assert not os.path.isfile(os.path.join(e_dir, "a", "keep-me"))
+    assert not os.path.isdir(os.path.join(e_dir, "a", "b"))
+    assert os.path.islink(os.path.join(e_dir, "a", "link"))
+
+
+def test_prune_keeps_lock_file(_instance, monkeypatch):
+    monkeypatch.setenv("MOLECULE_PARALLEL", "1")
+    lock_file = os.path.join(_instance.ephemeral_directory, ".lock")
+    assert os.path.isfile(lock_file)
+
+    _instance.prune()
+
+    assert os.path.isfile(lock_file)
+    locking.manager.release(lock_file)
+
+
 def test_config_member(_instance):
     assert isinstance(_instance.config, config.Config)
 
@@ -208,3 +236,73 @@ def test_ephemeral_directory_OVERRIDDEN_via_env_var_uses_absolute_path(monkeypat
     monkeypatch.setenv("MOLECULE_EPHEMERAL_DIRECTORY", "foo/bar")
 
     assert os.path.isabs(scenario.ephemeral_directory())
+
+
+def test_memory_directory_disabled(monkeypatch):
+    monkeypatch.delenv("MOLECULE_EPHEMERAL_MEMORY", raising=False)
+
+    assert scenario.memory_directory() is None
+
+
+def test_memory_directory_prefers_runtime_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOLECULE_EPHEMERAL_MEMORY", "true")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+    assert scenario.memory_directory("foo") == str(tmp_path / "foo")
+
+
+def test_memory_directory_shm_is_private(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOLECULE_EPHEMERAL_MEMORY", "true")
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(scenario, "SHM_DIRECTORY", str(tmp_path))
+    root = tmp_path / f"molecule-{os.getuid()}"
+
+    assert scenario.memory_directory("foo") == str(root / "foo")
+    assert stat.S_IMODE(os.lstat(root).st_mode) == 0o700
+
+
+def test_memory_directory_refuses_shared_shm(monkeypatch, tmp_path):
+    monkeypatch.setenv("MOLECULE_EPHEMERAL_MEMORY", "true")
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(scenario, "SHM_DIRECTORY", str(tmp_path))
+    root = tmp_path / f"molecule-{os.getuid()}"
+    root.mkdir()
+    root.chmod(0o777)
+
+    assert scenario.memory_directory("foo") is None
+
+    root.rmdir()
+    root.symlink_to(tmp_path)
+
+    assert scenario.memory_directory("foo") is None
+
+
+def test_persist_and_restore(
+    patched_config_validate,
+    config_instance: config.Config,
+    monkeypatch,
+    tmp_path,
+):
+    monkeypatch.setenv("MOLECULE_EPHEMERAL_MEMORY", str(tmp_path))
+    s = scenario.Scenario(config_instance)
+    assert s.ephemeral_directory.startswith(str(tmp_path))
+    disk = s.persistent_directory
+    util.write_file(os.path.join(s.ephemeral_directory, "state.yml"), "created: true")
+    util.write_file(os.path.join(s.ephemeral_directory, "scratch"), "")
+
+    s.persist()
+
+    assert os.path.isfile(os.path.join(disk, "state.yml"))
+    assert not os.path.exists(os.path.join(disk, "scratch"))
+
+    shutil.rmtree(s.ephemeral_directory)
+    s = scenario.Scenario(config_instance)
+
+    assert util.safe_load_file(os.path.join(s.ephemeral_directory, "state.yml")) == {
+        "created": True,
+    }
+
+    os.unlink(os.path.join(s.ephemeral_directory, "state.yml"))
+    s.persist()
+
+    assert not os.path.exists(os.path.join(disk, "state.yml"))
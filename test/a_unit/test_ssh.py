@@ -0,0 +1,89 @@
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+import os
+
+from molecule import ssh
+
+
+def test_enabled(monkeypatch):
+    assert not ssh.enabled()
+
+    monkeypatch.setenv("MOLECULE_SSH_REUSE", "true")
+    assert ssh.enabled()
+
+
+def test_control_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("MOLECULE_SSH_REUSE", "true")
+    ephemeral = str(tmp_path / "e")
+    os.mkdir(ephemeral)
+
+    directory = ssh.control_directory(ephemeral)
+    if len(os.path.join(ephemeral, "ssh")) <= ssh.MAX_DIRECTORY_LENGTH:
+        assert directory == os.path.join(ephemeral, "ssh")
+    assert not os.path.exists(directory)
+    assert ssh.connection_options(ephemeral) == []
+    assert ssh.prepare(ephemeral) == directory
+    assert os.path.isdir(directory)
+
+    long_ephemeral = str(tmp_path / ("x" * ssh.MAX_DIRECTORY_LENGTH))
+    long_directory = ssh.control_directory(long_ephemeral)
+    assert os.path.basename(long_directory).startswith("molecule-ssh-")
+    assert long_directory == ssh.prepare(long_ephemeral)
+    assert f"-o ControlPath={long_directory}/%C" in ssh.connection_options(
+        long_ephemeral,
+    )
+    ssh.close_masters(long_ephemeral)
+
+
+def test_prepare_refuses_shared_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("MOLECULE_SSH_REUSE", "true")
+    ephemeral = str(tmp_path)
+    directory = ssh.control_directory(ephemeral)
+    os.mkdir(directory)
+    os.chmod(directory, 0o777)
+
+    assert ssh.prepare(ephemeral) is None
+    assert not ssh.usable(ephemeral)
+    assert ssh.connection_options(ephemeral) == []
+    assert ssh.close_masters(ephemeral) == 0
+    assert os.path.isdir(directory)
+
+
+def test_close_masters(tmp_path, mocker):
+    ephemeral = str(tmp_path)
+    directory = ssh.prepare(ephemeral)
+    socket = os.path.join(directory, "0123abcd")
+    open(socket, "w").close()
+    mocker.patch.object(ssh.shutil, "which", return_value="/usr/bin/ssh")
+    run = mocker.patch.object(ssh.subprocess, "run")
+    run.return_value.returncode = 0
+
+    assert ssh.close_masters(ephemeral) == 1
+
+    assert run.call_args.args[0] == [
+        "/usr/bin/ssh",
+        "-o",
+        f"ControlPath={socket}",
+        "-O",
+        "exit",
+        "molecule",
+    ]
+    assert not os.path.exists(directory)
+    assert ssh.close_masters(ephemeral) == 0
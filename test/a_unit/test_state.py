@@ -118,3 +118,78 @@ def test_get_data_loads_existing_state_file(
     assert s.created
     assert not s.driver
     assert not s.prepared
+
+
+def test_change_state_appends_to_journal(_instance, config_instance: config.Config):
+    _instance.change_state("converged", True)
+
+    assert not util.safe_load_file(_instance.state_file)["converged"]
+    with open(_instance.journal_file) as f:
+        assert len(f.readlines()) == 1
+    assert state.State(config_instance).converged
+
+
+def test_batch_writes_one_transaction(_instance, config_instance: config.Config):
+    with _instance.batch():
+        _instance.change_state("created", True)
+        _instance.change_state("driver", "foo")
+
+    with open(_instance.journal_file) as f:
+        assert len(f.readlines()) == 1
+    s = state.State(config_instance)
+    assert s.created
+    assert s.driver == "foo"
+
+
+def test_batch_discards_changes_on_error(_instance, config_instance: config.Config):
+    with pytest.raises(RuntimeError), _instance.batch():
+        _instance.change_state("created", True)
+        raise RuntimeError
+
+    assert not _instance.created
+    assert not state.State(config_instance).created
+
+
+def test_reset_in_journal(_instance, config_instance: config.Config):
+    _instance.change_state("converged", True)
+    _instance.reset()
+    _instance.change_state("created", True)
+
+    s = state.State(config_instance)
+    assert not s.converged
+    assert s.created
+
+
+def test_compact(_instance, config_instance: config.Config, monkeypatch):
+    monkeypatch.setattr(state, "COMPACT_THRESHOLD", 2)
+    _instance.change_state("converged", True)
+    _instance.change_state("created", True)
+
+    assert os.path.getsize(_instance.journal_file) == 0
+    d = util.safe_load_file(_instance.state_file)
+    assert d["converged"]
+    assert d["created"]
+
+
+def test_journal_ignores_torn_write(_instance, config_instance: config.Config):
+    _instance.change_state("converged", True)
+    with open(_instance.journal_file, "a") as f:
+        f.write('{"set":{"created":tr')
+
+    s = state.State(config_instance)
+    assert s.converged
+    assert not s.created
+
+
+def test_append_drops_torn_write(_instance, config_instance: config.Config):
+    _instance.change_state("converged", True)
+    with open(_instance.journal_file, "a") as f:
+        f.write('{"set":{"created":tr')
+    _instance.change_state("prepared", True)
+
+    s = state.State(config_instance)
+    assert s.converged
+    assert s.prepared
+    assert not s.created
+    with open(_instance.journal_file) as f:
+        assert "tr{" not in f.read()
@@ -27,6 +27,7 @@
 from typing import Any
 
 import pytest
+import yaml
 from pytest_mock import MockerFixture
 
 from molecule import util
@@ -202,6 +203,18 @@ def test_write_file(temp_dir):
     assert x == data
 
 
+def test_write_file_skips_unchanged_content(temp_dir):
+    dest_file = os.path.join(temp_dir.strpath, "test_util_write_file.tmp")
+
+    assert util.write_file(dest_file, "foo")
+    os.utime(dest_file, ns=(0, 0))
+
+    assert not util.write_file(dest_file, "foo")
+    assert os.stat(dest_file).st_mtime_ns == 0
+    assert util.write_file(dest_file, "bar")
+    assert os.stat(dest_file).st_mtime_ns != 0
+
+
 def test_molecule_prepender(tmp_path: Path) -> None:
     fname = tmp_path / "some.txt"
     fname.write_text("foo bar")
@@ -231,6 +244,26 @@ def test_safe_dump_with_increase_indent():
     assert x == util.safe_dump(data)
 
 
+@pytest.mark.parametrize(
+    "data",
+    (
+        {"foo": "bar", "baz": {"qux": None, "quux": True}},
+        {"foo": [{"foo": "bar", "baz": ["zzyzx"]}], "bar": []},
+        [{"foo": "bar"}, {"baz": "x: y"}],
+        "foo",
+    ),
+)
+def test_safe_dump_matches_pure_python_dumper(data):
+    x = yaml.dump(
+        data,
+        Dumper=util.SafeDumper,
+        default_flow_style=False,
+        explicit_start=True,
+    )
+
+    assert x == util.safe_dump(data)
+
+
 def test_safe_load() -> None:
     assert {"foo": "bar"} == util.safe_load("foo: bar")
 
@@ -331,3 +364,24 @@ def test_abs_path_with_none_path() -> None:
 )
 def test_merge_dicts(a, b, x) -> None:
     assert x == util.merge_dicts(a, b)
+
+
+def test_layered_env() -> None:
+    base = {"FOO": "foo", "BAR": "bar"}
+    scenario = {"BAR": "scenario"}
+    env = util.layered_env(base, scenario, {"BAZ": "baz"})
+
+    assert env == {"FOO": "foo", "BAR": "scenario", "BAZ": "baz"}
+
+    env["FOO"] = "changed"
+    assert base == {"FOO": "foo", "BAR": "bar"}
+    assert scenario == {"BAR": "scenario"}
+    assert env.materialize() == {"FOO": "changed", "BAR": "scenario", "BAZ": "baz"}
+    assert isinstance(env.materialize(), dict)
+
+
+def test_run_command_materializes_layered_env() -> None:
+    env = util.layered_env(os.environ, {"myvar": "value"})
+    result = util.run_command(["printenv", "myvar"], env=env)
+
+    assert result.returncode == 0
@@ -46,6 +46,13 @@ def test_verifier_ansible_default_env_property(_instance):
     assert "MOLECULE_INSTANCE_CONFIG" in _instance.default_env
 
 
+def test_verifier_ansible_default_env_is_isolated(_instance):
+    env = _instance.default_env
+    env["FOO"] = "bar"
+
+    assert "FOO" not in _instance._config.provisioner.env
+
+
 @pytest.mark.parametrize("config_instance", ["_verifier_section_data"], indirect=True)
 def test_verifier_env_property(_instance):
     assert _instance.env["FOO"] == "bar"
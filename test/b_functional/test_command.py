@@ -353,11 +353,11 @@ def test_with_and_without_gitignore(
 ) -> None:
     if scenario_name == "test_wo_gitignore":
 
-        def mock_return(scenario_paths) -> list[str]:
-            return scenario_paths
+        def mock_return(self, path, is_dir=False) -> bool:
+            return False
 
         monkeypatch.setattr(
-            "molecule.command.base.filter_ignored_scenarios",
+            "molecule.discovery.GitIgnore.match",
             mock_return,
         )
 
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+#  Copyright (c) 2015-2018 Cisco Systems, Inc.
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#  DEALINGS IN THE SOFTWARE.
+"""Compare molecule YAML load/dump helpers against pure Python PyYAML.
+
+Also compares the YAML and JSON inventory formats as written by molecule and
+parsed by Ansible.
+
+Usage: python tools/benchmark_yaml.py [platform_count ...]
+"""
+import json
+import sys
+import timeit
+
+import yaml
+from ansible.parsing.utils.yaml import from_yaml
+
+from molecule import util
+
+
+def molecule_yml(count: int) -> dict:
+    """Return a molecule.yml like structure with ``count`` platforms."""
+    return {
+        "dependency": {"name": "galaxy", "options": {"requirements-file": "r.yml"}},
+        "driver": {"name": "default", "options": {"managed": False}},
+        "platforms": [
+            {
+                "name": f"instance-{i}",
+                "image": "quay.io/centos/centos:stream9",
+                "groups": ["web", "db"],
+                "children": ["east"],
+                "volumes": ["/sys/fs/cgroup:/sys/fs/cgroup:rw"],
+                "command": "/sbin/init",
+                "privileged": True,
+            }
+            for i in range(count)
+        ],
+        "provisioner": {
+            "name": "ansible",
+            "config_options": {"defaults": {"forks": 50}},
+            "inventory": {"group_vars": {"all": {"foo": "bar"}}},
+        },
+        "verifier": {"name": "ansible"},
+    }
+
+
+def inventory(count: int) -> dict:
+    """Return an inventory like structure with ``count`` hosts."""
+    hosts = {
+        f"instance-{i}": {
+            "ansible_connection": "community.docker.docker",
+            "ansible_host": f"10.0.{i // 250}.{i % 250}",
+            "ansible_user": "root",
+        }
+        for i in range(count)
+    }
+    molecule_vars = {
+        "molecule_file": "{{ lookup('env', 'MOLECULE_FILE') }}",
+        "molecule_yml": "{{ lookup('file', molecule_file) | from_yaml }}",
+    }
+    return {
+        "all": {"hosts": hosts, "vars": molecule_vars},
+        "web": {"hosts": hosts, "vars": molecule_vars},
+        "ungrouped": {"vars": {}},
+    }
+
+
+def pure_dump(data) -> str:
+    return yaml.dump(
+        data,
+        Dumper=util.SafeDumper,
+        default_flow_style=False,
+        explicit_start=True,
+    )
+
+
+def pure_load(string) -> dict:
+    return yaml.load(string, Loader=yaml.SafeLoader)
+
+
+def bench(name: str, data: dict, number: int) -> None:
+    text = pure_dump(data)
+    results = {
+        "dump (python)": timeit.timeit(lambda: pure_dump(data), number=number),
+        "dump (molecule)": timeit.timeit(lambda: util.safe_dump(data), number=number),
+        "load (python)": timeit.timeit(lambda: pure_load(text), number=number),
+        "load (molecule)": timeit.timeit(lambda: util.safe_load(text), number=number),
+    }
+    for label, seconds in results.items():
+        print(f"{name:>24} {label:>16}: {seconds / number * 1000:9.3f} ms")
+
+
+def bench_inventory_format(count: int, number: int) -> None:
+    data = inventory(count)
+    dumps = {"yaml": util.safe_dump, "json": json.dumps}
+    for fmt, dump in dumps.items():
+        text = dump(data)
+        results = {
+            f"{fmt} dump": timeit.timeit(lambda dump=dump: dump(data), number=number),
+            f"{fmt} ansible": timeit.timeit(
+                lambda text=text: from_yaml(text),
+                number=number,
+            ),
+        }
+        for label, seconds in results.items():
+            print(
+                f"{f'inventory ({count})':>24} {label:>16}: "
+                f"{seconds / number * 1000:9.3f} ms",
+            )
+
+
+def main() -> None:
+    counts = [int(c) for c in sys.argv[1:]] or [1, 10, 100, 1000]
+    print(f"libyaml available: {yaml.__with_libyaml__}")
+    for count in counts:
+        number = max(3, 1000 // count)
+        bench(f"molecule.yml ({count})", molecule_yml(count), number)
+        bench(f"inventory ({count})", inventory(count), number)
+        bench_inventory_format(count, number)
+
+
+if __name__ == "__main__":
+    main()